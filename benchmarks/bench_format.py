@@ -0,0 +1,112 @@
+"""Formatting throughput of tune file numbers: f-strings against mm2format.
+
+Formats the same values three ways and checks that the bytes agree:
+
+    fstring   f"{value:.6f}" per value, joined (the naive way)
+    percent   one bytes %-format for the whole batch (mm2format without NumPy)
+    numpy     mm2format's vectorized formatter
+
+first for a flat vector of values joined by tabs, then for whole
+_opp.vehCarSim files rendered from a table of varied rows (mm2params).
+Reports ns per value and the speed-up over f-strings; the best of --repeat
+runs counts. Run from the repository root:
+
+    python -m benchmarks.bench_format
+    python -m benchmarks.bench_format --values 5000000 --rows 50000
+"""
+import argparse
+import sys
+import time
+import mm2format
+from mm2params import ParamTable, schema_for
+
+
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def report(title, count, timings):
+    print(title)
+    base = timings["fstring"][0]
+    for name, (seconds, _) in timings.items():
+        print(f"  {name:8} {seconds / count * 1e9:8.1f} ns/value  {base / seconds:6.2f}x")
+
+
+def bench_vector(np, values, repeat):
+    numbers = values.tolist()
+    percent = b"\t".join([b"%.6f"] * len(numbers))
+    timings = {
+        "fstring": best_time(lambda: "\t".join([f"{value:.6f}" for value in numbers]).encode("latin-1"), repeat),
+        "percent": best_time(lambda: percent % tuple(numbers), repeat),
+        "numpy": best_time(lambda: mm2format.join_fixed(values, b"\t"), repeat),
+    }
+    report(f"{len(numbers):,} values joined by tabs:", len(numbers), timings)
+    return len({result for _, result in timings.values()}) == 1
+
+
+def bench_files(np, rows, repeat):
+    schema = schema_for("veh_opp_carsim", "\r\n")
+    table = ParamTable(schema, rows)
+    records = table.to_numpy()
+    rng = np.random.default_rng(0)
+    for name in schema.names:
+        records[name] *= rng.uniform(0.5, 1.5, rows)
+    del records
+    for name, integer in zip(schema.names, schema.integer):
+        if integer:
+            table.set_column(name, table.column(name))
+
+    segments = [segment.decode("latin-1") for segment in schema.segments]
+    values = table.values.tolist()
+    width = len(schema)
+
+    def fstrings():
+        files = []
+        for offset in range(0, len(values), width):
+            parts = [segments[0]]
+            for i, value in enumerate(values[offset:offset + width]):
+                parts.append(f"{int(value)}" if schema.integer[i] else f"{value:.6f}")
+                parts.append(segments[i + 1])
+            files.append("".join(parts).encode("latin-1"))
+        return files
+
+    timings = {
+        "fstring": best_time(fstrings, repeat),
+        "percent": best_time(lambda: [table.render(row) for row in range(rows)], repeat),
+        "numpy": best_time(lambda: list(table.render_rows()), repeat),
+    }
+    report(f"{rows:,} _opp.vehCarSim files ({width} values each):", rows * width, timings)
+    return timings["fstring"][1] == timings["percent"][1] == timings["numpy"][1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--values", type=int, default=1_000_000, help="length of the value vector")
+    parser.add_argument("--rows", type=int, default=20_000, help="files rendered from the table")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    try:
+        import numpy as np
+    except ImportError:
+        print("This benchmark needs NumPy: pip install numpy", file=sys.stderr)
+        return 2
+
+    rng = np.random.default_rng(0)
+    # Half the values with few decimals like hand-written tune values
+    values = rng.uniform(-5000, 5000, args.values)
+    values[::2] = np.round(values[::2], 2)
+    same = bench_vector(np, values, args.repeat)
+    same = bench_files(np, args.rows, args.repeat) and same
+    if not same:
+        print("Formatters disagree", file=sys.stderr)
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
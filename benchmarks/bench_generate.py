@@ -0,0 +1,134 @@
+"""End-to-end vehicle generation throughput.
+
+Runs the same steps as the GUI's Submit button (validate, normalise the
+colours, create the folders, render and write the files) for batches of
+1, 100, 10k and 100k vehicles and reports vehicles/s, files/s, MB/s, peak
+RSS and the time spent creating folders versus rendering and writing
+files. Run from the repository root:
+
+    python -m benchmarks.bench_generate
+    python -m benchmarks.bench_generate --sizes 1 100 10000 --json before.json
+    python -m benchmarks.bench_generate --json after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from mm2core import (
+    create_vehicle_folders, normalize_colors, render_vehicle_files, validate_vehicle, write_vehicle_files,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PHASES = ("validate", "makedirs", "render", "write")
+
+
+# Peak resident set size of this process in bytes, or None where unknown
+def peak_rss():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run(vehicles, output_dir):
+    clock = time.perf_counter
+    phases = dict.fromkeys(PHASES, 0.0)
+    files = total_bytes = 0
+    start = clock()
+    for i in range(vehicles):
+        t0 = clock()
+        vehicle_name = f"vpbench{i:06d}"
+        validate_vehicle(vehicle_name, f"Bench Car {i}", " Red | Blue|Green ")
+        colors = normalize_colors(" Red | Blue|Green ")
+        base_path = os.path.join(output_dir, vehicle_name)
+        t1 = clock()
+        create_vehicle_folders(base_path)
+        t2 = clock()
+        rendered_files = render_vehicle_files(vehicle_name, f"Bench Car {i}", colors)
+        t3 = clock()
+        write_vehicle_files(base_path, rendered_files)
+        t4 = clock()
+        phases["validate"] += t1 - t0
+        phases["makedirs"] += t2 - t1
+        phases["render"] += t3 - t2
+        phases["write"] += t4 - t3
+        files += len(rendered_files)
+        total_bytes += sum(len(rendered.data) for rendered in rendered_files)
+    elapsed = clock() - start
+    return {
+        "vehicles": vehicles,
+        "files": files,
+        "bytes": total_bytes,
+        "seconds": elapsed,
+        "vehicles_per_s": vehicles / elapsed,
+        "files_per_s": files / elapsed,
+        "bytes_per_s": total_bytes / elapsed,
+        "peak_rss": peak_rss(),
+        "phases": phases,
+    }
+
+
+def print_result(result, baseline=None):
+    phases = result["phases"]
+    shares = " ".join(f"{name} {phases[name] / result['seconds']:>4.0%}" for name in PHASES)
+    rss = f"{result['peak_rss'] / 2**20:.0f} MB" if result["peak_rss"] else "n/a"
+    line = (
+        f"{result['vehicles']:>8} {result['seconds']:>9.2f} {result['vehicles_per_s']:>9.0f}"
+        f" {result['files_per_s']:>9.0f} {result['bytes_per_s'] / 1e6:>7.1f} {rss:>8}  {shares}"
+    )
+    if baseline:
+        line += f"  ({result['vehicles_per_s'] / baseline['vehicles_per_s'] - 1:+.1%} veh/s)"
+    print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000, 100000], help="vehicles per run")
+    parser.add_argument("--dir", help="scratch folder (default: a temporary folder)")
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--compare", help="results of an earlier run (--json) to compare against")
+    args = parser.parse_args(argv)
+
+    baselines = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baselines = {result["vehicles"]: result for result in json.load(file)["results"]}
+
+    results = []
+    scratch = tempfile.mkdtemp(prefix="mm2bench-", dir=args.dir)
+    try:
+        print(f"{'vehicles':>8} {'seconds':>9} {'veh/s':>9} {'files/s':>9} {'MB/s':>7} {'peak RSS':>8}  phases")
+        for vehicles in args.sizes:
+            output_dir = os.path.join(scratch, f"out{vehicles}")
+            os.mkdir(output_dir)
+            result = run(vehicles, output_dir)
+            shutil.rmtree(output_dir)
+            print_result(result, baselines.get(vehicles))
+            results.append(result)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if args.json:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
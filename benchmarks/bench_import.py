@@ -0,0 +1,75 @@
+"""Cold start of the headless modules, measured with python -X importtime.
+
+Imports each module in a fresh interpreter, reports the cumulative import
+time of the module (median of --repeat runs) and its most expensive
+dependencies, and fails when a module exceeds --budget-ms or pulls in
+PyQt5. Run from the repository root:
+
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --modules mm2core --top 10
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADLESS_MODULES = ["mm2core", "mm2batch", "mm2basestruc"]
+
+# import time: self [us] | cumulative | imported package
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+# Import module in a new interpreter; returns {module: (self us, cumulative us)}
+# for module and everything it imported (not the interpreter's own start-up)
+def import_times(module):
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if process.returncode:
+        raise RuntimeError(f"import {module} failed:\n{process.stderr}")
+    times = {}
+    # Dependencies are listed before the module itself, indented below it
+    for line in reversed(process.stderr.splitlines()):
+        match = _LINE.match(line)
+        if not match:
+            continue
+        if times and not match.group(3):
+            break
+        times[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=HEADLESS_MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="maximum cumulative import time per module")
+    parser.add_argument("--top", type=int, default=5, help="dependencies to list per module")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        # The first run writes the bytecode caches
+        import_times(module)
+        runs = [import_times(module) for _ in range(max(args.repeat, 1))]
+        total = statistics.median(times[module][1] for times in runs) / 1000
+        status = "ok" if total <= args.budget_ms else "OVER BUDGET"
+        print(f"{module}: {total:.1f} ms ({status}, budget {args.budget_ms:.0f} ms)")
+        if total > args.budget_ms:
+            failed = True
+        qt = sorted(name for name in runs[-1] if name.split(".")[0] in ("PyQt5", "vp_setup_ui", "mm2gui"))
+        if qt:
+            print(f"  imports the GUI: {', '.join(qt)}")
+            failed = True
+        heaviest = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+        for name, (self_us, _) in heaviest:
+            print(f"  {self_us / 1000:6.1f} ms  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
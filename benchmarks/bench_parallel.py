@@ -0,0 +1,56 @@
+"""Scaling of batch generation from 1 to N worker processes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parallel --vehicles 10000 --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from mm2batch import run_batch
+
+
+def write_manifest(path, count):
+    with open(path, "w", encoding="utf-8") as manifest:
+        for i in range(count):
+            manifest.write(json.dumps({"name": f"vpbench{i:06d}", "description": f"Bench Car {i}", "colors": "Red|Blue|Green"}) + "\n")
+
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, 8, 16, cpus} & set(range(1, cpus + 1)))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=10000)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--dir", help="scratch folder (default: a temporary folder)")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.mkdtemp(prefix="mm2bench-", dir=args.dir)
+    try:
+        manifest_path = os.path.join(scratch, "manifest.jsonl")
+        write_manifest(manifest_path, args.vehicles)
+        print(f"{args.vehicles} vehicles, chunk size {args.chunk_size}")
+        print(f"{'workers':>8} {'seconds':>9} {'veh/s':>9} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            output_dir = os.path.join(scratch, f"out{workers}")
+            os.mkdir(output_dir)
+            start = time.perf_counter()
+            stats = run_batch(manifest_path, output_dir, workers=workers, chunk_size=args.chunk_size)
+            elapsed = time.perf_counter() - start
+            if stats.failed:
+                print(f"{stats.failed} vehicles failed", file=sys.stderr)
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {stats.generated / elapsed:>9.0f} {baseline / elapsed:>7.2f}x")
+            shutil.rmtree(output_dir)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
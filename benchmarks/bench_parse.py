@@ -0,0 +1,72 @@
+"""Tune file parsing throughput in files per second.
+
+Parses every tune file under --corpus (or a synthetic corpus of generated
+vehicles held in memory), checks that each one dumps back to the same
+bytes and reports files/s and MB/s. Run from the repository root:
+
+    python -m benchmarks.bench_parse --vehicles 5000
+    python -m benchmarks.bench_parse --corpus path\\to\\mods
+"""
+import argparse
+import os
+import sys
+import time
+import mm2tune
+from mm2core import render_vehicle_files
+
+TUNE_EXTENSIONS = {
+    ".asnode", ".mmmirror", ".vehcarsim", ".vehcardamage", ".vehgyro",
+    ".vehstuck", ".camtrackcs", ".campovcs", ".dgbangerdata",
+}
+
+
+def load_corpus(root):
+    corpus = []
+    for folder, _, filenames in os.walk(root):
+        for filename in filenames:
+            if os.path.splitext(filename)[1].lower() in TUNE_EXTENSIONS:
+                with open(os.path.join(folder, filename), "rb") as file:
+                    corpus.append(file.read())
+    return corpus
+
+
+def synthetic_corpus(vehicles):
+    corpus = []
+    for i in range(vehicles):
+        for rendered in render_vehicle_files(f"vpbench{i:06d}", "Bench Car", "Red"):
+            if rendered.data.startswith(b"type: a"):
+                corpus.append(rendered.data)
+    return corpus
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="folder to collect tune files from")
+    parser.add_argument("--vehicles", type=int, default=5000, help="size of the synthetic corpus")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.vehicles)
+    if not corpus:
+        print("No tune files found", file=sys.stderr)
+        return 1
+    total_bytes = sum(len(data) for data in corpus)
+    print(f"{len(corpus)} files, {total_bytes / 1e6:.1f} MB")
+
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        documents = [mm2tune.parse(data) for data in corpus]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"parse: {len(corpus) / best:,.0f} files/s, {total_bytes / best / 1e6:.1f} MB/s")
+
+    start = time.perf_counter()
+    mismatches = sum(document.to_bytes() != data for document, data in zip(documents, corpus))
+    elapsed = time.perf_counter() - start
+    print(f"dump: {len(corpus) / elapsed:,.0f} files/s, {mismatches} round-trip mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Throughput cost of atomic publishing and of each durability mode.
+
+Generates the same vehicles with plain folder output and with --atomic at
+durability none, vehicle and batch (see mm2publish), in a fresh folder per
+mode, and reports vehicles/s relative to plain output. The batch mode
+includes the final flush. Modes run in turns (--repeat) so that the file
+system's background work spreads over all of them. Run from the repository
+root:
+
+    python -m benchmarks.bench_publish
+    python -m benchmarks.bench_publish --vehicles 200 --modes direct vehicle --dir D:\\bench
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from mm2core import generate_vehicle
+from mm2publish import finish_batch
+
+MODES = ("direct", "none", "vehicle", "batch")
+
+
+def run(mode, vehicles, output_dir):
+    atomic = mode != "direct"
+    durability = mode if atomic else "none"
+    start = time.perf_counter()
+    for i in range(vehicles):
+        generate_vehicle(f"vppub{i:06d}", f"Bench Car {i}", "Red|Blue|Green", output_dir, atomic=atomic,
+                         durability=durability)
+    if atomic:
+        finish_batch(output_dir, durability)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=500)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--dir", help="folder to generate in (default: a temporary folder); use the target disk")
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="mm2publish-", dir=args.dir)
+    seconds = dict.fromkeys(args.modes, 0.0)
+    try:
+        for round_num in range(max(args.repeat, 1)):
+            for mode in args.modes:
+                output_dir = os.path.join(root, f"{mode}{round_num}")
+                os.makedirs(output_dir)
+                seconds[mode] += run(mode, args.vehicles, output_dir)
+                shutil.rmtree(output_dir)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    total = args.vehicles * max(args.repeat, 1)
+    base = seconds.get("direct")
+    print(f"{'mode':>8} {'veh/s':>9}  vs direct")
+    for mode in args.modes:
+        rate = total / seconds[mode]
+        relative = f"{base / seconds[mode] * 100:8.0f}%" if base else ""
+        print(f"{mode:>8} {rate:9.0f}  {relative}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Per-vehicle file system call and allocation budgets.
+
+Generates vehicles in a few output modes and checks what one vehicle costs
+against fixed budgets, failing (exit code 1) when a change goes over them,
+e.g. a file kind written twice or folders created with makedirs again:
+
+    mkdir       folders created (os.mkdir audit events)
+    open        files and folders opened, for reading or writing
+    open_write  files opened for writing
+    write       write calls: os.write, and write on the files a scenario
+                opens itself (the archive)
+    peak_kb     highest allocation peak while generating one vehicle
+    retained_kb memory still allocated afterwards, averaged per vehicle
+
+File system calls are counted with an audit hook (sys.addaudithook),
+writes by wrapping os.write and the scenario's own file objects, and
+allocations with tracemalloc, in separate passes after a warm-up. Budgets
+for the counts follow the file kind registry (one open and one write per
+file, one mkdir per folder). Run from the repository root:
+
+    python -m benchmarks.check_budgets
+    python -m benchmarks.check_budgets --scenarios folders --vehicles 500
+"""
+import argparse
+import collections
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from mm2core import FILE_KINDS, generate_vehicle, vehicle_dirs
+from mm2output import ZipSink
+
+METRICS = ("mkdir", "open", "open_write", "write", "peak_kb", "retained_kb")
+COUNTS = ("mkdir", "open", "open_write", "write")
+
+
+# Budgets per vehicle and scenario for a registry of `files` file kinds
+# in `dirs` folders (counting the vehicle folder)
+def budgets(files, dirs):
+    return {
+        # A new vehicle folder: the folder descriptor is opened twice (to
+        # create the folders and to write the files); each file is written
+        # in one call
+        "folders": {
+            "mkdir": dirs, "open": files + 2, "open_write": files, "write": files, "peak_kb": 160, "retained_kb": 1,
+        },
+        # Re-running over up to date folders only reads the manifest
+        "incremental": {"mkdir": 0, "open": 1, "open_write": 0, "write": 0, "peak_kb": 160, "retained_kb": 1},
+        # Streaming into an open archive touches no files; the archive keeps
+        # an index entry per member and deflate needs its window per member.
+        # zipfile writes a member's local header, its data, the compressor's
+        # tail and the header again with the sizes (folders have no data).
+        "archive": {
+            "mkdir": 0, "open": 0, "open_write": 0, "write": 4 * files + 3 * dirs, "peak_kb": 1024, "retained_kb": 24,
+        },
+    }
+
+
+# File system events seen by the audit hook, and os.write calls, while
+# counting is set
+class _Counter:
+    def __init__(self):
+        self.counting = False
+        self.events = collections.Counter()
+        sys.addaudithook(self)
+        os_write = os.write
+
+        def write(fd, data):
+            if self.counting:
+                self.events["write"] += 1
+            return os_write(fd, data)
+        os.write = write
+
+    def __call__(self, event, args):
+        if not self.counting:
+            return
+        if event == "open":
+            self.events["open"] += 1
+            flags = args[2]
+            if flags is not None and flags & (os.O_WRONLY | os.O_RDWR):
+                self.events["open_write"] += 1
+        elif event == "os.mkdir":
+            self.events["mkdir"] += 1
+
+
+# A file object counting its write calls in a _Counter
+class _CountingFile:
+    def __init__(self, file, counter):
+        self.file = file
+        self.counter = counter
+
+    def write(self, data):
+        if self.counter.counting:
+            self.counter.events["write"] += 1
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+# The scenario as a function generating vehicle i, with what it needs set up
+def _scenario(name, output_dir, stack, counter):
+    if name == "folders":
+        return lambda i: generate_vehicle(f"vpbudget{i:06d}", "Budget Car", "Red|Blue", output_dir)
+    if name == "incremental":
+        def generate(i):
+            # The first pass over the folder writes it, later ones only check
+            generate_vehicle(f"vpincr{i % 50:06d}", "Budget Car", "Red|Blue", output_dir, incremental=True)
+        for i in range(50):
+            generate(i)
+        return generate
+    if name == "archive":
+        file = open(os.path.join(output_dir, "budget.zip"), "wb")
+        stack.append(file)
+        sink = ZipSink(_CountingFile(file, counter))
+        stack.append(sink)
+        return lambda i: generate_vehicle(f"vparchive{i:06d}", "Budget Car", "Red|Blue", sink=sink)
+    raise ValueError(f"Unknown scenario '{name}'")
+
+
+# Measure one scenario over `vehicles` vehicles; returns {metric: value per vehicle}
+def measure(name, vehicles, output_dir, counter):
+    stack = []
+    try:
+        generate = _scenario(name, output_dir, stack, counter)
+        # Warm-up: caches, compiled templates, first-use imports
+        for i in range(vehicles, vehicles + 20):
+            generate(i)
+
+        counter.events.clear()
+        counter.counting = True
+        try:
+            for i in range(vehicles):
+                generate(i)
+        finally:
+            counter.counting = False
+        result = {metric: counter.events[metric] / vehicles for metric in COUNTS}
+
+        tracemalloc.start()
+        try:
+            peak = 0
+            start = tracemalloc.get_traced_memory()[0]
+            for i in range(vehicles + 20, 2 * vehicles + 20):
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                generate(i)
+                peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+            retained = tracemalloc.get_traced_memory()[0] - start
+        finally:
+            tracemalloc.stop()
+        result["peak_kb"] = peak / 1024
+        result["retained_kb"] = max(retained, 0) / 1024 / vehicles
+        return result
+    finally:
+        # Sinks before the files they write to
+        for closable in reversed(stack):
+            closable.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", default=["folders", "incremental", "archive"])
+    parser.add_argument("--vehicles", type=int, default=200, help="vehicles measured per scenario and pass")
+    parser.add_argument("--dir", help="folder to generate in (default: a temporary folder, removed afterwards)")
+    args = parser.parse_args(argv)
+
+    limits = budgets(len(FILE_KINDS), len(vehicle_dirs()) + 1)
+    counter = _Counter()
+    failed = False
+    root = args.dir or tempfile.mkdtemp(prefix="mm2budget-")
+    try:
+        for name in args.scenarios:
+            output_dir = os.path.join(root, name)
+            os.makedirs(output_dir, exist_ok=True)
+            result = measure(name, max(args.vehicles, 1), output_dir, counter)
+            print(f"{name}:")
+            for metric in METRICS:
+                over = result[metric] > limits[name][metric]
+                failed = failed or over
+                print(f"  {metric:12} {result[metric]:8.1f}  budget {limits[name][metric]:6}  {'OVER BUDGET' if over else 'ok'}")
+    finally:
+        if not args.dir:
+            shutil.rmtree(root, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""MM2 .ar archives (the "DAVE" format the game loads mods from).
+
+Layout, all integers little-endian u32:
+
+    0x000  header: "DAVE", file count, size of the name block, size of the data
+    0x800  file table: one 16 byte entry per file, sorted by lower-case name:
+           name offset (into the name block), data offset (from the start
+           of the archive), size, stored size
+           name block: NUL terminated "/" separated paths
+           file data, starting on a 2048 byte boundary
+
+Entries whose stored size differs from their size hold raw deflate data.
+The format has no directory records; folders are implied by the paths, so
+empty folders are not stored.
+
+ArSink writes archives, ArArchive memory-maps existing ones and hands out
+file contents as views into the mapping.
+"""
+import fnmatch
+import mmap
+import os
+import re
+import struct
+import zlib
+from collections import namedtuple
+
+AR_MAGIC = b"DAVE"
+AR_TABLE_OFFSET = 0x800
+AR_ALIGNMENT = 0x800
+NAME_ENCODING = "latin-1"
+
+_HEADER = struct.Struct("<4sIII")
+_ENTRY = struct.Struct("<IIII")
+
+
+def _align(offset, alignment=AR_ALIGNMENT):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+# Collects the files of one or many vehicles and writes the archive on
+# close: header, file table, names and data in a single sequential pass.
+# Identical file contents are stored once and shared by their entries.
+class ArSink:
+    # Paths in .ar archives are rooted at tune/, aud/, ... so vehicles of a
+    # batch are not put under a folder of their own
+    per_vehicle_folder = False
+
+    def __init__(self, file):
+        self.file = file
+        self._entries = {}
+
+    def add_dir(self, name):
+        pass
+
+    def add_file(self, name, data):
+        name = name.replace("\\", "/")
+        self._entries[name.lower()] = (name, data)
+
+    def close(self):
+        entries = [self._entries[key] for key in sorted(self._entries)]
+        self._entries = {}
+
+        names = bytearray()
+        name_offsets = []
+        for name, _ in entries:
+            name_offsets.append(len(names))
+            names += name.encode(NAME_ENCODING) + b"\0"
+
+        data_start = _align(AR_TABLE_OFFSET + _ENTRY.size * len(entries) + len(names))
+        blobs = []
+        offsets = {}
+        table = bytearray()
+        data_size = 0
+        for name_offset, (name, data) in zip(name_offsets, entries):
+            offset = offsets.get(data)
+            if offset is None:
+                offset = offsets[data] = data_start + data_size
+                blobs.append(data)
+                data_size += len(data)
+            table += _ENTRY.pack(name_offset, offset, len(data), len(data))
+
+        header = _HEADER.pack(AR_MAGIC, len(entries), len(names), data_size)
+        chunks = [
+            header,
+            bytes(AR_TABLE_OFFSET - len(header)),
+            table,
+            names,
+            bytes(data_start - AR_TABLE_OFFSET - len(table) - len(names)),
+        ]
+        chunks.extend(blobs)
+        if isinstance(self.file, (str, os.PathLike)):
+            with open(self.file, "wb") as file:
+                file.writelines(chunks)
+        else:
+            self.file.writelines(chunks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if exc_info[0] is None:
+            self.close()
+
+
+# One file of an archive: offset is from the start of the archive
+ArEntry = namedtuple("ArEntry", ["name", "offset", "size", "stored_size"])
+
+
+# Read-only view of an .ar archive. The file is memory-mapped and its table
+# indexed once; read() returns memoryviews into the mapping, so nothing is
+# copied until the caller does. Views must be released before close().
+class ArArchive:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        try:
+            self.entries = self._read_table()
+        except Exception:
+            self.close()
+            raise
+        self.index = {entry.name.lower(): entry for entry in self.entries}
+
+    def _read_table(self):
+        if len(self._map) < AR_TABLE_OFFSET:
+            raise ValueError(f"'{self.path}' is too small to be an .ar archive")
+        magic, count, names_size, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != AR_MAGIC:
+            raise ValueError(f"'{self.path}' is not a DAVE .ar archive (magic {magic!r})")
+        names_start = AR_TABLE_OFFSET + _ENTRY.size * count
+        if names_start + names_size > len(self._map):
+            raise ValueError(f"'{self.path}' is truncated")
+        table = self._view[AR_TABLE_OFFSET:names_start]
+        names = self._map[names_start:names_start + names_size]
+        entries = []
+        for name_offset, offset, size, stored_size in _ENTRY.iter_unpack(table):
+            name = names[name_offset:names.index(b"\0", name_offset)].decode(NAME_ENCODING)
+            entries.append(ArEntry(name, offset, size, stored_size))
+        table.release()
+        return entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return (entry.name for entry in self.entries)
+
+    def __contains__(self, name):
+        return name.replace("\\", "/").lower() in self.index
+
+    def entry(self, name):
+        try:
+            return self.index[name.replace("\\", "/").lower()]
+        except KeyError:
+            raise KeyError(f"'{name}' is not in '{self.path}'") from None
+
+    # Contents of a file: a zero-copy memoryview for stored entries, bytes
+    # for compressed ones
+    def read(self, name):
+        entry = self.entry(name)
+        data = self._view[entry.offset:entry.offset + entry.stored_size]
+        if entry.stored_size != entry.size:
+            return zlib.decompress(data, -zlib.MAX_WBITS)
+        return data
+
+    # Names matching a shell pattern such as "tune/vehicle/*.vehCarSim",
+    # ignoring case like the game does
+    def glob(self, pattern):
+        match = re.compile(fnmatch.translate(pattern.replace("\\", "/").lower())).match
+        return [entry.name for key, entry in self.index.items() if match(key)]
+
+    def close(self):
+        if self._map is not None:
+            self._view.release()
+            self._map.close()
+            self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
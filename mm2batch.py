@@ -0,0 +1,365 @@
+import argparse
+import collections
+import contextlib
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from mm2metrics import PROFILE_MODES, Metrics, profiling
+from mm2output import ARCHIVE_EXTENSIONS, open_archive
+from mm2core import NEWLINES, VehicleSpec, generate_vehicle, get_file_kinds, normalize_colors, seed_overrides, validate_vehicle
+
+
+# Stream vehicle specs from a .csv or .jsonl manifest, one line at a time.
+# CSV manifests need a header with name, description and colors columns;
+# JSON lines hold objects with the same keys (colors may also be a list).
+# Yields (line number, VehicleSpec or the ValueError describing a bad row).
+def read_manifest(manifest_path):
+    for line_num, row in read_manifest_rows(manifest_path):
+        yield line_num, row if isinstance(row, ValueError) else _make_spec(*row)
+
+
+# The rows of a manifest as they are, before validation: yields (line
+# number, (name, description, colors) or a ValueError for unreadable lines)
+def read_manifest_rows(manifest_path):
+    if os.path.splitext(manifest_path)[1].lower() in (".jsonl", ".ndjson"):
+        yield from _read_jsonl_manifest(manifest_path)
+    else:
+        yield from _read_csv_manifest(manifest_path)
+
+
+def _read_csv_manifest(manifest_path):
+    with open(manifest_path, newline="", encoding="utf-8-sig") as manifest:
+        reader = csv.DictReader(manifest)
+        missing = {"name", "description", "colors"} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"Manifest '{manifest_path}' is missing columns: {', '.join(sorted(missing))}")
+        for row in reader:
+            yield reader.line_num, (row.get("name"), row.get("description"), row.get("colors"))
+
+
+def _read_jsonl_manifest(manifest_path):
+    with open(manifest_path, encoding="utf-8-sig") as manifest:
+        for line_num, line in enumerate(manifest, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_num, ValueError(f"Invalid JSON: {e}")
+                continue
+            if not isinstance(row, dict):
+                yield line_num, ValueError("Expected a JSON object")
+                continue
+            colors = row.get("colors")
+            if isinstance(colors, list):
+                colors = "|".join(str(c) for c in colors)
+            yield line_num, (row.get("name"), row.get("description"), colors)
+
+
+def _make_spec(vehicle_name, description, variations):
+    vehicle_name = (vehicle_name or "").strip()
+    description = (description or "").strip()
+    variations = (variations or "").strip()
+    try:
+        validate_vehicle(vehicle_name, description, variations)
+    except ValueError as e:
+        return e
+    return VehicleSpec(vehicle_name, description, normalize_colors(variations))
+
+
+# Totals of a batch run; skipped vehicles were done in the run a journal
+# resumes
+BatchStats = namedtuple("BatchStats", ["generated", "failed", "written", "unchanged", "orphaned", "skipped"])
+
+
+# Generate one manifest entry. Runs in the worker processes, so any failure
+# is returned as a message instead of raised to keep it to this vehicle.
+# Returns (line number, vehicle name, error message or None, VehicleResult,
+# seconds taken).
+def generate_entry(entry):
+    line_num, spec, options = entry
+    if isinstance(spec, ValueError):
+        return line_num, None, str(spec), None, 0.0
+    start = time.perf_counter()
+    try:
+        result = generate_vehicle(spec.name, spec.description, spec.colors, **options)
+    except Exception as e:
+        return line_num, spec.name, str(e), None, time.perf_counter() - start
+    return line_num, spec.name, None, result, time.perf_counter() - start
+
+
+# The outcome of a manifest entry as one JSON object (a line of --ndjson)
+def result_record(line_num, vehicle_name, error, result, seconds):
+    record = {"line": line_num, "vehicle": vehicle_name, "status": "failed" if error else "ok", "seconds": round(seconds, 6)}
+    if error:
+        record["error"] = error
+        return record
+    record.update(
+        path=result.base_path,
+        files=[{"label": label, "path": path, "bytes": size} for (label, path), size in zip(result.files, result.sizes)],
+        bytes=sum(result.sizes), written=result.written, unchanged=result.unchanged, orphaned=result.orphaned,
+    )
+    return record
+
+
+# Returns the results of a chunk and the metrics recorded for it, if any
+def _generate_chunk(chunk):
+    return [generate_entry(entry) for entry in chunk], chunk[0][2].get("metrics")
+
+
+# Hand entries to the pool chunk_size at a time, keeping at most `window`
+# chunks in flight so huge manifests are still streamed. Results come back
+# in manifest order; the metrics of each chunk are merged into metrics.
+def _ordered_pool_map(executor, entries, chunk_size, window, metrics=None):
+    pending = collections.deque()
+    while True:
+        while len(pending) < window:
+            chunk = list(itertools.islice(entries, chunk_size))
+            if not chunk:
+                break
+            pending.append(executor.submit(_generate_chunk, chunk))
+        if not pending:
+            return
+        results, chunk_metrics = pending.popleft().result()
+        if metrics is not None and chunk_metrics is not None:
+            metrics.merge(chunk_metrics)
+        yield from results
+
+
+# Generate every vehicle of the manifest under output_dir, spread over
+# `workers` processes (1 runs everything in this process). Failures are
+# reported and counted without stopping the batch. progress(done, failed)
+# is called after each vehicle, in manifest order. With incremental, files
+# that are already up to date are not rewritten. archive_each writes one
+# archive per vehicle in that format, archive_path writes the whole batch
+# into a single archive (in this process, as it is one sequential stream).
+# seed is an (archive path, source vehicle) pair to take tune files from.
+# metrics is an optional mm2metrics.Metrics to record every stage in. store
+# ("hardlink" or "reflink") links identical files to a content-addressed
+# store in output_dir. report is called with the generate_entry result of
+# each vehicle as it comes in, before progress. journal is an optional
+# mm2journal.Journal recording the vehicles as they start and finish;
+# vehicles it has as done are skipped. With atomic every vehicle folder is
+# published in one rename with the given durability ("none", "vehicle" or
+# "batch", see mm2publish). Returns BatchStats.
+def run_batch(manifest_path, output_dir, progress=None, log=sys.stderr, workers=1, chunk_size=16, newline=os.linesep,
+              file_kinds=None, incremental=False, archive_each=None, archive_path=None, seed=None, metrics=None,
+              store=None, report=None, journal=None, atomic=False, durability="none"):
+    options = {
+        "output_dir": output_dir, "newline": newline, "file_kinds": file_kinds, "incremental": incremental,
+        "archive": archive_each, "seed": seed, "metrics": metrics, "store": store, "atomic": atomic,
+        "durability": durability,
+    }
+    generated = failed = written = unchanged = orphaned = skipped = 0
+
+    # Entries are journaled as started when they are handed out, which for
+    # a process pool is when their chunk is submitted
+    def pending_entries():
+        nonlocal skipped
+        for line_num, spec in read_manifest(manifest_path):
+            if journal is not None and not isinstance(spec, ValueError):
+                if journal.is_done(line_num, spec.name):
+                    skipped += 1
+                    continue
+                journal.started(line_num, spec.name)
+            yield line_num, spec, options
+
+    # Vehicles that were in flight when an earlier run died are generated
+    # again; first remove what they left half-written
+    if journal is not None and journal.in_flight and not archive_path:
+        from mm2publish import discard_leftovers
+        from mm2store import remove_temporary
+        for vehicle_name in set(journal.in_flight.values()):
+            discard_leftovers(output_dir, vehicle_name, file_kinds)
+        if store:
+            remove_temporary(output_dir)
+    entries = pending_entries()
+    # Per-vehicle archives go straight into output_dir, which nothing else
+    # creates
+    if archive_each:
+        os.makedirs(output_dir, exist_ok=True)
+    with contextlib.ExitStack() as stack:
+        if archive_path:
+            options["sink"] = stack.enter_context(open_archive(archive_path))
+            results = map(generate_entry, entries)
+        elif workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            # Each chunk records into an empty copy that is merged back here
+            if metrics is not None:
+                options["metrics"] = Metrics()
+            results = _ordered_pool_map(executor, entries, chunk_size, workers * 2, metrics)
+        else:
+            results = map(generate_entry, entries)
+        for line_num, vehicle_name, error, result, seconds in results:
+            if journal is not None and vehicle_name is not None:
+                journal.finished(line_num, vehicle_name, error)
+            if report:
+                report(line_num, vehicle_name, error, result, seconds)
+            if error is None:
+                generated += 1
+                written += result.written
+                unchanged += result.unchanged
+                orphaned += result.orphaned
+            else:
+                failed += 1
+                prefix = f"{manifest_path}:{line_num}: " + (f"{vehicle_name}: " if vehicle_name else "")
+                print(prefix + error, file=log)
+            if progress:
+                progress(generated, failed)
+    if atomic:
+        from mm2publish import finish_batch
+        finish_batch(output_dir, durability)
+    return BatchStats(generated, failed, written, unchanged, orphaned, skipped)
+
+
+# Plan the run (see mm2plan) and report it instead of generating anything
+def _dry_run(args, file_kinds, seed):
+    from mm2plan import plan_vehicles
+    plan = plan_vehicles(read_manifest(args.manifest), args.output, NEWLINES[args.newline], file_kinds, seed)
+    if args.plan == "-":
+        plan.write_listing(sys.stdout)
+    elif args.plan:
+        with open(args.plan, "w", encoding="utf-8", newline="\n") as listing:
+            plan.write_listing(listing)
+    for line_num, vehicle_name, error in plan.errors:
+        print(f"{args.manifest}:{line_num}: " + (f"{vehicle_name}: " if vehicle_name else "") + error, file=sys.stderr)
+    for path, reason in plan.conflicts:
+        print(f"Conflict: {path}: {reason}", file=sys.stderr)
+    print(plan.summary(), file=sys.stderr)
+    return 1 if plan.errors or plan.conflicts else 0
+
+
+# A run_batch report function writing result_record lines to path (stdout
+# for -). Each line is flushed, so readers can pick up vehicles as they are
+# done. With append (a resumed run) the lines are added to those of the
+# earlier runs.
+def _ndjson_reporter(stack, path, append=False):
+    if path == "-":
+        output = sys.stdout
+    else:
+        output = stack.enter_context(open(path, "a" if append else "w", encoding="utf-8", newline="\n"))
+
+    def report(*entry_result):
+        output.write(json.dumps(result_record(*entry_result), separators=(",", ":")) + "\n")
+        output.flush()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="mm2basestruc batch",
+        description="Generate MM2 vehicle structures from a .csv or .jsonl manifest.",
+    )
+    parser.add_argument("manifest", help="manifest with name, description and colors per vehicle")
+    parser.add_argument("-o", "--output", default=os.getcwd(), help="folder the vehicles are created in (default: current folder)")
+    parser.add_argument("--newline", choices=sorted(NEWLINES), default="native", help="line ending of the tune files (default: native)")
+    parser.add_argument("--file-kinds", metavar="JSON", help="file kind registry to use instead of templates/file_kinds.json")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--incremental", action="store_true", help="only write files whose contents changed since the last run")
+    output.add_argument("--archive", metavar="PATH", help="write every vehicle into one .zip, .tar, .tar.gz, .tar.xz or MM2 .ar archive")
+    output.add_argument("--archive-each", choices=sorted(ARCHIVE_EXTENSIONS), help="write one archive per vehicle instead of folders")
+    output.add_argument("--store", choices=("hardlink", "reflink"), help="write identical files once to OUTPUT/.mm2store and link them into the vehicles")
+    output.add_argument("--atomic", action="store_true", help="generate each vehicle aside and publish its folder in one rename")
+    output.add_argument("--dry-run", action="store_true", help="report the folders and files the run would create and overwrite, without writing")
+    parser.add_argument("--durability", choices=("none", "vehicle", "batch"), default="none",
+                        help="with --atomic, fsync each vehicle or the whole batch (default: none)")
+    parser.add_argument("--plan", metavar="PATH", help="with --dry-run, write the planned operations to PATH (- for stdout)")
+    parser.add_argument("--seed-ar", metavar="ARCHIVE", help="take the tune files from a vehicle in an existing .ar archive")
+    parser.add_argument("--seed-vehicle", metavar="NAME", help="vehicle in --seed-ar to start from (default: the only one)")
+    parser.add_argument("-j", "--workers", type=int, default=1, metavar="N", help="worker processes (0 uses every CPU, default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=16, metavar="N", help="vehicles handed to a worker at a time (default: 16)")
+    parser.add_argument("--progress-every", type=int, default=100, metavar="N", help="report progress every N vehicles (0 disables)")
+    parser.add_argument("--journal", metavar="PATH", help="record started and finished vehicles in a checkpoint journal")
+    parser.add_argument("--resume", action="store_true", help="continue the run recorded in --journal, skipping finished vehicles")
+    parser.add_argument("--journal-sync", type=float, default=1.0, metavar="SECONDS", help="fsync the journal at most this often (default: 1)")
+    parser.add_argument("--ndjson", metavar="PATH", help="write one JSON line per vehicle (paths, bytes, seconds, errors) to PATH (- for stdout) as vehicles finish")
+    parser.add_argument("--metrics", metavar="PATH", help="append per-stage timings and sizes of the run to a JSON lines file")
+    parser.add_argument("--metrics-prom", metavar="PATH", help="write per-stage timings and sizes as a Prometheus textfile")
+    parser.add_argument("--profile", choices=PROFILE_MODES, help="profile the run (this process only, combine with -j 1)")
+    parser.add_argument("--profile-output", metavar="PATH", help="profile output (default: mm2batch.prof or mm2batch-tracemalloc.txt)")
+    args = parser.parse_args(argv)
+    if args.durability != "none" and not args.atomic:
+        parser.error("--durability needs --atomic")
+    if args.resume and not args.journal:
+        parser.error("--resume needs --journal")
+    if args.resume and args.archive:
+        parser.error("--resume cannot append to an --archive; use folders, --archive-each or --store")
+
+    start = time.monotonic()
+
+    def progress(generated, failed):
+        done = generated + failed
+        if args.progress_every and done % args.progress_every == 0:
+            rate = done / max(time.monotonic() - start, 1e-9)
+            print(f"{done} vehicles processed ({failed} failed, {rate:.1f} vehicles/s)", file=sys.stderr)
+
+    file_kinds = args.file_kinds and os.path.abspath(args.file_kinds)
+    seed = (os.path.abspath(args.seed_ar), args.seed_vehicle) if args.seed_ar else None
+    metrics = None
+    if args.metrics or args.metrics_prom or args.profile:
+        metrics = Metrics({"manifest": os.path.basename(args.manifest)})
+    profile_output = args.profile_output or ("mm2batch.prof" if args.profile == "cprofile" else "mm2batch-tracemalloc.txt")
+    try:
+        # Compile a custom registry and index the seed archive up front so
+        # mistakes in them fail fast
+        get_file_kinds(file_kinds)
+        if seed:
+            seed_overrides(*seed, file_kinds)
+        if args.dry_run:
+            return _dry_run(args, file_kinds, seed)
+        with contextlib.ExitStack() as stack:
+            report = _ndjson_reporter(stack, args.ndjson, args.resume) if args.ndjson else None
+            journal = None
+            if args.journal:
+                from mm2journal import Journal
+                journal = stack.enter_context(
+                    Journal(args.journal, args.manifest, args.output, args.resume, args.journal_sync)
+                )
+                if args.resume:
+                    print(
+                        f"Resuming: {len(journal.done)} vehicles done, "
+                        f"{len(journal.in_flight)} interrupted vehicles are generated again",
+                        file=sys.stderr,
+                    )
+            if args.profile:
+                stack.enter_context(profiling(args.profile, profile_output, metrics))
+            stats = run_batch(
+                args.manifest, args.output, progress,
+                workers=args.workers or os.cpu_count() or 1, chunk_size=max(args.chunk_size, 1),
+                newline=NEWLINES[args.newline], file_kinds=file_kinds, incremental=args.incremental,
+                archive_each=args.archive_each, archive_path=args.archive, seed=seed, metrics=metrics,
+                store=args.store, report=report, journal=journal, atomic=args.atomic, durability=args.durability,
+            )
+        if metrics is not None:
+            metrics.gauges.update(
+                run_seconds=time.monotonic() - start, vehicles_generated=stats.generated, vehicles_failed=stats.failed,
+            )
+            if args.metrics:
+                metrics.write_jsonl(args.metrics)
+            if args.metrics_prom:
+                metrics.write_prometheus(args.metrics_prom)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    elapsed = time.monotonic() - start
+    print(
+        f"Generated {stats.generated} vehicles in {elapsed:.2f}s ({stats.failed} failed"
+        + (f", {stats.skipped} already done)" if args.resume else ")"),
+        file=sys.stderr,
+    )
+    print(f"Files: {stats.written} written, {stats.unchanged} unchanged, {stats.orphaned} orphaned", file=sys.stderr)
+    if args.store:
+        from mm2store import store_usage
+        blobs, size = store_usage(args.output)
+        print(f"Store: {blobs} unique files, {size / 1e6:.1f} MB", file=sys.stderr)
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
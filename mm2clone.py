@@ -0,0 +1,246 @@
+"""Clone an existing vehicle folder under a new base name.
+
+The files that carry the vehicle's name (the .info and the audio CSVs, as
+declared by the file kinds with a vehicle_name parameter) are rewritten
+for the new name: exactly the "key=" values and CSV cells their templates
+fill in with the name (BaseName=vpbullet, vpbulletHORN), so free text such
+as the description is left alone. Files named after the vehicle are
+renamed, and all other files are reflinked (a copy-on-write clone on
+Btrfs, XFS and other file systems supporting FICLONE), hardlinked or
+copied, so cloning a vehicle with heavy geometry and textures costs
+metadata operations only where the file system allows it.
+
+Textures keep their names, as the geometry refers to them by name. The
+clone is built in a staging folder (see mm2publish) and renamed into place,
+so a failed clone leaves nothing behind.
+
+    python -m mm2basestruc clone .\\vpbullet vpbullet2 --description "Ford Mustang GT"
+"""
+import argparse
+import csv
+import errno
+import io
+import os
+import shutil
+import sys
+import threading
+from collections import namedtuple
+from mm2core import ENCODING, MANIFEST_NAME, get_file_kinds, normalize_colors
+from mm2publish import STAGING_DIR, discard, publish
+
+LINK_MODES = ("reflink", "hardlink", "copy")
+# Past tense of the link modes, for the summary
+_LINKED = {"reflink": "reflinked", "hardlink": "hardlinked", "copy": "copied"}
+# Folders whose files keep their names
+KEEP_NAMES_IN = ("texture",)
+
+# Linux FICLONE ioctl: share the extents of another file
+_FICLONE = 0x40049409
+# Stands in for the vehicle name when finding where templates put it
+_NAME_MARK = "__mm2_vehicle_name__"
+
+# Outcome of a clone: the new folder and how many files were rewritten for
+# the new name, reflinked or hardlinked, and copied
+CloneResult = namedtuple("CloneResult", ["base_path", "rewritten", "linked", "copied"])
+
+
+# Base name of the vehicle in a folder: the name of its only tune/*.info
+# file, or the folder name
+def source_vehicle_name(source_dir):
+    tune_dir = os.path.join(source_dir, "tune")
+    try:
+        names = [os.path.splitext(name)[0] for name in os.listdir(tune_dir) if name.lower().endswith(".info")]
+    except OSError:
+        names = []
+    return names[0] if len(names) == 1 else os.path.basename(os.path.normpath(source_dir))
+
+
+# Where a file kind puts the vehicle name, found by rendering it with a
+# marker for the name: {"key=": pieces} for the values of "key=" lines and
+# a list of pieces for CSV cells, where pieces is the text around the name
+# (("", "HORN") for ${vehicle_name}HORN)
+def name_fields(kind):
+    text = kind.render({"vehicle_name": _NAME_MARK, "description": "", "colors": ""}, "\n").decode(ENCODING)
+    keys, cells = {}, []
+    for line in text.split("\n"):
+        if _NAME_MARK not in line:
+            continue
+        key, sep, value = line.partition("=")
+        if sep and _NAME_MARK not in key:
+            keys[key + sep] = tuple(value.split(_NAME_MARK))
+        else:
+            cells.extend(tuple(cell.split(_NAME_MARK)) for cell in next(csv.reader([line])) if _NAME_MARK in cell)
+    return keys, cells
+
+
+# The files whose contents depend on the vehicle name, as {path (lower
+# case, "/" separated, relative to the vehicle folder): name_fields}
+def name_bearing_files(vehicle_name, file_kinds=None):
+    values = {"vehicle_name": vehicle_name, "description": "", "colors": ""}
+    return {
+        "/".join(kind.folder + (kind.filename.format_map(values),)).lower(): name_fields(kind)
+        for kind in get_file_kinds(file_kinds)
+        if "vehicle_name" in kind.params
+    }
+
+
+# Rewrite the name fields (see name_fields) that hold the old name (in any
+# case) for the new name and, in .info files, the description and colours
+# if given. Other text is kept as it is.
+def rewrite_contents(data, old_name, new_name, fields, description=None, colors=None):
+    keys, cells = fields
+    old_cells = {old_name.join(pieces).lower(): new_name.join(pieces) for pieces in cells}
+    replace = {"Description=": description, "Colors=": colors}
+    lines = data.decode(ENCODING, "surrogateescape").split("\n")
+    for i, line in enumerate(lines):
+        text = line.rstrip("\r")
+        key, sep, value = text.partition("=")
+        if sep and replace.get(key + sep) is not None:
+            text = key + sep + replace.pop(key + sep)
+        elif sep and key + sep in keys:
+            pieces = keys[key + sep]
+            if value.lower() == old_name.join(pieces).lower():
+                text = key + sep + new_name.join(pieces)
+        elif old_cells:
+            row = next(csv.reader([text]), [])
+            if any(cell.lower() in old_cells for cell in row):
+                buffer = io.StringIO()
+                csv.writer(buffer, lineterminator="").writerow([old_cells.get(cell.lower(), cell) for cell in row])
+                text = buffer.getvalue()
+        lines[i] = text + line[len(line.rstrip("\r")):]
+    return "\n".join(lines).encode(ENCODING, "surrogateescape")
+
+
+def _renamed(filename, old_name, new_name):
+    if filename.lower().startswith(old_name.lower()):
+        return new_name + filename[len(old_name):]
+    return filename
+
+
+# Link or copy one file. Returns True when no data was copied; reflink
+# and hardlink fall back to a copy (and stop trying) where unsupported.
+class _Linker:
+    def __init__(self, mode):
+        self.mode = mode
+
+    def __call__(self, source, target):
+        if self.mode == "reflink" and self._reflink(source, target):
+            return True
+        if self.mode == "hardlink":
+            try:
+                os.link(source, target)
+                return True
+            except OSError:
+                self.mode = "copy"
+        shutil.copyfile(source, target)
+        return False
+
+    def _reflink(self, source, target):
+        try:
+            import fcntl
+        except ImportError:
+            self.mode = "copy"
+            return False
+        with open(source, "rb") as source_file, open(target, "wb") as target_file:
+            try:
+                fcntl.ioctl(target_file.fileno(), _FICLONE, source_file.fileno())
+                return True
+            except OSError as e:
+                if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV, errno.ENOSYS):
+                    self.mode = "copy"
+                    return False
+                raise
+
+
+# Clone the vehicle in source_dir as new_name into output_dir (next to the
+# source by default). link is "reflink", "hardlink" (the clone shares the
+# files with the source: editing one in place changes both) or "copy".
+def clone_vehicle(source_dir, new_name, output_dir=None, description=None, colors=None, link="reflink",
+                  file_kinds=None):
+    if not new_name:
+        raise ValueError("Please enter the base vehicle name.")
+    if link not in LINK_MODES:
+        raise ValueError(f"Unknown link mode '{link}' (use {', '.join(LINK_MODES)})")
+    if not os.path.isdir(source_dir):
+        raise ValueError(f"'{source_dir}' is not a vehicle folder")
+    old_name = source_vehicle_name(source_dir)
+    base_path = os.path.join(output_dir or os.path.dirname(os.path.abspath(source_dir)), new_name)
+    if os.path.exists(base_path):
+        raise ValueError(f"'{base_path}' already exists")
+    rewrite = name_bearing_files(old_name, file_kinds)
+    if colors is not None:
+        colors = normalize_colors(colors)
+    linker = _Linker(link)
+    rewritten = linked = copied = 0
+
+    staging_root = os.path.join(os.path.dirname(base_path), STAGING_DIR)
+    os.makedirs(staging_root, exist_ok=True)
+    staging = os.path.join(staging_root, f"{new_name}.{os.getpid()}.{threading.get_ident()}")
+    try:
+        # Parents come before their children, so each folder is one mkdir
+        os.mkdir(staging)
+        for folder, dirnames, filenames in os.walk(source_dir):
+            relfolder = os.path.relpath(folder, source_dir)
+            parts = () if relfolder == os.curdir else tuple(relfolder.split(os.sep))
+            target_folder = os.path.join(staging, *parts)
+            for dirname in dirnames:
+                os.mkdir(os.path.join(target_folder, dirname))
+            keep_names = parts[:1] and parts[0].lower() in KEEP_NAMES_IN
+            for filename in filenames:
+                # The manifest lists the source's files, not the clone's
+                if not parts and filename == MANIFEST_NAME:
+                    continue
+                source = os.path.join(folder, filename)
+                target = os.path.join(target_folder, filename if keep_names else _renamed(filename, old_name, new_name))
+                fields = rewrite.get("/".join(parts + (filename,)).lower())
+                if fields is not None:
+                    with open(source, "rb") as file:
+                        data = file.read()
+                    with open(target, "wb") as file:
+                        file.write(rewrite_contents(data, old_name, new_name, fields, description, colors))
+                    rewritten += 1
+                elif linker(source, target):
+                    linked += 1
+                else:
+                    copied += 1
+        publish(staging, base_path)
+    except BaseException:
+        discard(staging)
+        raise
+    return CloneResult(base_path, rewritten, linked, copied)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="mm2basestruc clone",
+        description="Clone an existing vehicle folder under a new base name.",
+    )
+    parser.add_argument("source", help="folder of the vehicle to clone")
+    parser.add_argument("name", help="base name of the new vehicle")
+    parser.add_argument("-o", "--output", help="folder the clone is created in (default: next to the source)")
+    parser.add_argument("--description", help="new description for the .info file")
+    parser.add_argument("--colors", help="new colors (variations) for the .info file, separated by |")
+    parser.add_argument("--link", choices=LINK_MODES, default="reflink",
+                        help="how unchanged files are cloned (default: reflink, copying where unsupported)")
+    parser.add_argument("--file-kinds", metavar="JSON", help="file kind registry to use instead of templates/file_kinds.json")
+    args = parser.parse_args(argv)
+
+    try:
+        result = clone_vehicle(
+            args.source, args.name.strip(), args.output, args.description, args.colors, args.link,
+            args.file_kinds and os.path.abspath(args.file_kinds),
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(
+        f"Cloned {source_vehicle_name(args.source)} to {result.base_path}: {result.rewritten} rewritten, "
+        + ("" if args.link == "copy" else f"{result.linked} {_LINKED[args.link]}, ")
+        + f"{result.copied} copied",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
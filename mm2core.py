@@ -0,0 +1,558 @@
+import csv
+import functools
+import io
+import json
+import locale
+import os
+import re
+import time
+from collections import namedtuple
+
+# Archive support (mm2ar, mm2output) and hashlib are imported where they are
+# used, so importing the core stays cheap for scripts that only write folders.
+
+# Files are encoded like text-mode open() did, with the platform's preferred
+# encoding, and use the native line ending unless newline says otherwise.
+ENCODING = locale.getpreferredencoding(False)
+NEWLINES = {"native": os.linesep, "lf": "\n", "crlf": "\r\n"}
+
+# File kinds are declared in templates/file_kinds.json: target folder,
+# filename pattern, template file and the parameters the template uses.
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+DEFAULT_FILE_KINDS = os.path.join(TEMPLATES_DIR, "file_kinds.json")
+
+# One vehicle to generate: base name, description and "|" separated colours
+VehicleSpec = namedtuple("VehicleSpec", ["name", "description", "colors"])
+
+
+# Validate the raw inputs, using the same messages as the GUI
+def validate_vehicle(vehicle_name, description, variations):
+    if not vehicle_name:
+        raise ValueError("Please enter the base vehicle name.")
+    if not description:
+        raise ValueError("Please enter the vehicle description.")
+    if not variations:
+        raise ValueError("Please enter the colors (variations).")
+
+
+# Process variations (colours) into a single string
+def normalize_colors(variations):
+    return "|".join([v.strip() for v in variations.split("|") if v.strip()])
+
+
+# Folder structure of a vehicle as posix paths relative to the vehicle
+# folder. This is the one layout model: native paths, archive members and
+# the folders to create (see vehicle_dirs) are all derived from it.
+VEHICLE_FOLDERS = (
+    "aud/aud22/engines",
+    "aud/aud22/horns",
+    "aud/cardata/opponent",
+    "aud/cardata/player",
+    "bound",
+    "geometry",
+    "jpg",
+    "texture",
+    "tune",
+    "tune/vehicle",
+    "tune/banger",
+    "tune/camera",
+)
+
+
+# Folder structure of a vehicle (including sub folders) as native paths
+def vehicle_folders(base_path):
+    return [os.path.join(base_path, *folder.split("/")) for folder in VEHICLE_FOLDERS]
+
+
+# Create the vehicle folder and every folder of the layout and of the file
+# kinds top-down: parents come first, so each folder is a single mkdir
+# instead of makedirs checking every ancestor. metrics is an optional
+# mm2metrics.Metrics to record the stages in.
+def create_vehicle_folders(base_path, metrics=None, file_kinds=None):
+    start = time.perf_counter_ns()
+    os.makedirs(base_path, exist_ok=True)
+    dir_fd = _open_dir(base_path)
+    try:
+        for folder in vehicle_dirs(file_kinds):
+            try:
+                os.mkdir(folder if dir_fd is not None else os.path.join(base_path, *folder.split("/")), dir_fd=dir_fd)
+            except FileExistsError:
+                pass
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+    if metrics is not None:
+        metrics.record("makedirs", time.perf_counter_ns() - start)
+
+
+# Where the platform supports it (not on Windows) folders are created and
+# files opened relative to a descriptor of the vehicle folder, so each call
+# only resolves the path below it
+_DIR_FD = {os.open, os.mkdir, os.stat, os.unlink} <= os.supports_dir_fd and hasattr(os, "O_DIRECTORY")
+# Files are truncated after the open, once it is known they are not shared
+# (see _open_for_write)
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0) | getattr(os, "O_CLOEXEC", 0)
+
+
+# A descriptor of folder, or None where dir_fd is not supported
+def _open_dir(folder):
+    if not _DIR_FD:
+        return None
+    return os.open(folder, os.O_RDONLY | os.O_DIRECTORY | getattr(os, "O_CLOEXEC", 0))
+
+
+# File kind registry
+# A compiled file kind. folder is a tuple of path parts relative to the
+# vehicle folder, filename a str.format pattern and render(values, newline)
+# returns the file contents as bytes.
+FileKind = namedtuple("FileKind", ["kind", "label", "folder", "filename", "params", "render"])
+
+# One rendered file of a vehicle
+RenderedFile = namedtuple("RenderedFile", ["kind", "label", "folder", "filename", "data"])
+
+# Per-vehicle parameters; templates and filename patterns refer to them as ${name}
+PARAMETERS = ("vehicle_name", "description", "colors")
+_PLACEHOLDER = re.compile(r"\$\{(\w+)\}")
+
+
+# Turn a ${name} template into a str.format pattern, checking that it only
+# uses the declared parameters
+def _format_pattern(template, params, source):
+    parts = _PLACEHOLDER.split(template)
+    unknown = set(parts[1::2]) - set(params)
+    if unknown:
+        raise ValueError(f"{source} uses undeclared parameters: {', '.join(sorted(unknown))}")
+    return "".join(
+        "{" + part + "}" if i % 2 else part.replace("{", "{{").replace("}", "}}")
+        for i, part in enumerate(parts)
+    )
+
+
+# Templates without parameters are the same for every vehicle, so they are
+# encoded once per process and the bytes are reused.
+@functools.lru_cache(maxsize=None)
+def constant_blob(content, newline=os.linesep):
+    return content.replace("\n", newline).encode(ENCODING)
+
+
+def _compile_text(template, params, source):
+    if not params:
+        return lambda values, newline: constant_blob(template, newline)
+    pattern = _format_pattern(template, params, source)
+    patterns = {}
+
+    def render(values, newline):
+        newline_pattern = patterns.get(newline)
+        if newline_pattern is None:
+            newline_pattern = patterns[newline] = pattern.replace("\n", newline)
+        return newline_pattern.format_map(values).encode(ENCODING)
+    return render
+
+
+# CSV rows rendered to bytes (csv always ends rows with \r\n)
+def render_csv(data):
+    buffer = io.StringIO(newline="")
+    csv.writer(buffer).writerows(data)
+    return buffer.getvalue().encode(ENCODING)
+
+
+# CSV templates are parsed once; cells with parameters are formatted per
+# vehicle and written through csv so names get quoted when needed
+def _compile_csv(template, params, source):
+    if not params:
+        data = render_csv(csv.reader(template.splitlines()))
+        return lambda values, newline: data
+    rows = [
+        [(True, _format_pattern(cell, params, source)) if _PLACEHOLDER.search(cell) else (False, cell) for cell in row]
+        for row in csv.reader(template.splitlines())
+    ]
+    return lambda values, newline: render_csv(
+        [[cell.format_map(values) if templated else cell for templated, cell in row] for row in rows]
+    )
+
+
+_COMPILERS = {"text": _compile_text, "csv": _compile_csv}
+
+
+def _compile_kind(entry, templates_dir):
+    kind = entry["kind"]
+    params = entry.get("params", [])
+    if not set(params) <= set(PARAMETERS):
+        raise ValueError(f"File kind '{kind}' declares unknown parameters: {', '.join(sorted(set(params) - set(PARAMETERS)))}")
+    template_path = os.path.join(templates_dir, entry["template"])
+    compiler = _COMPILERS.get(entry.get("format", "text"))
+    if compiler is None:
+        raise ValueError(f"File kind '{kind}' has unknown format '{entry['format']}'")
+    with open(template_path, "rb") as template_file:
+        template = template_file.read().decode("utf-8").replace("\r\n", "\n")
+    return FileKind(
+        kind,
+        entry.get("label", kind),
+        tuple(part for part in entry["folder"].split("/") if part),
+        _format_pattern(entry["filename"], PARAMETERS, f"File kind '{kind}' filename"),
+        tuple(params),
+        compiler(template, params, f"Template '{template_path}'"),
+    )
+
+
+# Load and compile a file kind registry. Template paths are relative to the
+# registry file.
+def load_file_kinds(registry_path):
+    with open(registry_path, encoding="utf-8") as registry:
+        entries = json.load(registry)
+    templates_dir = os.path.dirname(os.path.abspath(registry_path))
+    try:
+        return tuple(_compile_kind(entry, templates_dir) for entry in entries)
+    except KeyError as e:
+        raise ValueError(f"File kind registry '{registry_path}' has an entry without {e}")
+
+
+# Compiled registries are kept per process, keyed by path (None is the
+# built-in registry), so worker processes only need the path.
+@functools.lru_cache(maxsize=None)
+def get_file_kinds(registry_path=None):
+    return load_file_kinds(registry_path or DEFAULT_FILE_KINDS)
+
+
+FILE_KINDS = get_file_kinds()
+
+
+# Seeding from existing archives
+# A vehicle can start from the tune files of a vehicle shipped in an .ar
+# archive instead of the built-in templates. Archives are memory-mapped
+# once per process and their files used as zero-copy views.
+@functools.lru_cache(maxsize=None)
+def open_seed_archive(archive_path):
+    from mm2ar import ArArchive
+    return ArArchive(archive_path)
+
+
+# Base name of the single vehicle in an archive, found by its .info file
+def archive_vehicle_name(archive):
+    names = [os.path.splitext(name.rsplit("/", 1)[-1])[0] for name in archive.glob("tune/*.info")]
+    if len(names) != 1:
+        found = ", ".join(sorted(names)) or "none"
+        raise ValueError(f"Name the vehicle to seed from in '{archive.path}' (vehicles found: {found})")
+    return names[0]
+
+
+# Contents of source_vehicle's files in the archive for every file kind that
+# does not depend on the vehicle's name, description or colours, keyed by kind
+@functools.lru_cache(maxsize=None)
+def seed_overrides(archive_path, source_vehicle=None, file_kinds=None):
+    archive = open_seed_archive(archive_path)
+    source_vehicle = source_vehicle or archive_vehicle_name(archive)
+    values = {"vehicle_name": source_vehicle, "description": "", "colors": ""}
+    overrides = {}
+    for kind in get_file_kinds(file_kinds):
+        name = "/".join(kind.folder + (kind.filename.format_map(values),))
+        if not kind.params and name in archive:
+            overrides[kind.kind] = archive.read(name)
+    if not overrides:
+        raise ValueError(f"'{archive_path}' has no tune files for vehicle '{source_vehicle}'")
+    return overrides
+
+
+# File generation functions
+# Render every file of a vehicle in registry order. seed is an optional
+# (archive path, source vehicle) pair to take the tune files from, and
+# overrides a {kind: bytes} dict of files to use as they are (taking
+# precedence over the seed).
+def render_vehicle_files(vehicle_name, description, colors, newline=os.linesep, file_kinds=None, seed=None,
+                         metrics=None, overrides=None):
+    values = {"vehicle_name": vehicle_name, "description": description, "colors": colors}
+    if seed:
+        overrides = {**seed_overrides(*seed, file_kinds), **(overrides or {})}
+    elif overrides is None:
+        overrides = {}
+    kinds = FILE_KINDS if file_kinds is None else get_file_kinds(file_kinds)
+    if metrics is None:
+        return [
+            RenderedFile(
+                kind.kind, kind.label, kind.folder, kind.filename.format_map(values),
+                overrides[kind.kind] if kind.kind in overrides else kind.render(values, newline),
+            )
+            for kind in kinds
+        ]
+    rendered_files = []
+    for kind in kinds:
+        start = time.perf_counter_ns()
+        data = overrides[kind.kind] if kind.kind in overrides else kind.render(values, newline)
+        rendered_files.append(RenderedFile(kind.kind, kind.label, kind.folder, kind.filename.format_map(values), data))
+        metrics.record("render", time.perf_counter_ns() - start, len(data), kind.kind)
+    return rendered_files
+
+
+# Open path (relative to dir_fd if given) for writing, empty. A file that
+# is hard-linked elsewhere, such as a store blob (see mm2store) or a file
+# shared with the source of a clone, is unlinked and created afresh rather
+# than overwritten, so the other names keep their contents.
+def _open_for_write(path, dir_fd=None):
+    try:
+        fd = os.open(path, _WRITE_FLAGS, 0o666, dir_fd=dir_fd)
+    except PermissionError:
+        # A read-only link
+        if os.stat(path, dir_fd=dir_fd).st_nlink < 2:
+            raise
+        fd = None
+    if fd is not None:
+        try:
+            if os.fstat(fd).st_nlink < 2:
+                os.ftruncate(fd, 0)
+                return fd
+        except BaseException:
+            os.close(fd)
+            raise
+        os.close(fd)
+    os.unlink(path, dir_fd=dir_fd)
+    return os.open(path, _WRITE_FLAGS | os.O_TRUNC, 0o666, dir_fd=dir_fd)
+
+
+def _write_fd(fd, data, sync):
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        if sync:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# With sync the data is on disk (fsync) before the file is closed
+def write_bytes(file_path, data, sync=False):
+    try:
+        fd = _open_for_write(file_path)
+    except FileNotFoundError:
+        # Kinds outside the standard folders get theirs on first use
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        fd = _open_for_write(file_path)
+    _write_fd(fd, data, sync)
+    return file_path
+
+
+# Write data to relpath ("/" separated) below the folder dir_fd refers to;
+# file_path is the same file as a native path
+def write_bytes_at(dir_fd, relpath, data, file_path, sync=False):
+    try:
+        fd = _open_for_write(relpath, dir_fd)
+    except FileNotFoundError:
+        return write_bytes(file_path, data, sync)
+    _write_fd(fd, data, sync)
+    return file_path
+
+
+# Write rendered files below a vehicle folder whose folders exist (fsynced
+# with sync). Returns (label, path) pairs in generation order.
+def write_vehicle_files(base_path, rendered_files, metrics=None, sync=False):
+    try:
+        dir_fd = _open_dir(base_path)
+    except FileNotFoundError:
+        dir_fd = None
+    files = []
+    try:
+        for rendered in rendered_files:
+            start = time.perf_counter_ns()
+            file_path = os.path.join(base_path, *rendered.folder, rendered.filename)
+            if dir_fd is None:
+                write_bytes(file_path, rendered.data, sync)
+            else:
+                write_bytes_at(dir_fd, "/".join(rendered.folder + (rendered.filename,)), rendered.data, file_path, sync)
+            files.append((rendered.label, file_path))
+            if metrics is not None:
+                metrics.record("write", time.perf_counter_ns() - start, len(rendered.data), rendered.kind)
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+    return files
+
+
+# Generate every configuration file and CSV of a vehicle whose folders exist
+def generate_vehicle_files(base_path, vehicle_name, description, colors, newline=os.linesep, file_kinds=None,
+                           metrics=None):
+    rendered_files = render_vehicle_files(vehicle_name, description, colors, newline, file_kinds, metrics=metrics)
+    return write_vehicle_files(base_path, rendered_files, metrics)
+
+
+# Every folder of a vehicle including ancestors and the folders of the file
+# kinds, parents first, as created on disk and in archives
+@functools.lru_cache(maxsize=None)
+def vehicle_dirs(file_kinds=None):
+    folders = set()
+    for folder in VEHICLE_FOLDERS + tuple("/".join(kind.folder) for kind in get_file_kinds(file_kinds)):
+        parts = folder.split("/")
+        folders.update("/".join(parts[:i]) for i in range(1, len(parts) + 1))
+    return tuple(sorted(folders - {""}))
+
+
+# Archive output
+# Stream the folders and rendered files of a vehicle into an archive sink
+# (see mm2output) under prefix. Returns the (label, archive member) pairs.
+def emit_vehicle(sink, rendered_files, prefix="", file_kinds=None, metrics=None):
+    if prefix:
+        sink.add_dir(prefix)
+    for folder in vehicle_dirs(file_kinds):
+        sink.add_dir(prefix + folder)
+    files = []
+    for rendered in rendered_files:
+        start = time.perf_counter_ns()
+        name = prefix + "/".join(rendered.folder + (rendered.filename,))
+        sink.add_file(name, rendered.data)
+        files.append((rendered.label, name))
+        if metrics is not None:
+            metrics.record("archive", time.perf_counter_ns() - start, len(rendered.data), rendered.kind)
+    return files
+
+
+# Incremental generation
+# Each vehicle folder keeps a manifest of the files generated into it with
+# their size, content hash and mtime, so a re-run only writes files whose
+# rendered bytes changed.
+MANIFEST_NAME = ".mm2manifest.json"
+
+
+@functools.lru_cache(maxsize=256)
+def content_digest(data):
+    import hashlib
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def read_vehicle_manifest(base_path):
+    try:
+        with open(os.path.join(base_path, MANIFEST_NAME), encoding="utf-8") as manifest:
+            return json.load(manifest).get("files", {})
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def write_vehicle_manifest(base_path, files):
+    manifest_path = os.path.join(base_path, MANIFEST_NAME)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as manifest:
+        json.dump({"version": 1, "files": files}, manifest, separators=(",", ":"), sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+
+# Returns the manifest entry of a file that already holds data, or None
+def _unchanged_entry(file_path, data, digest, recorded):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    if stat.st_size != len(data):
+        return None
+    entry = [len(data), digest, stat.st_mtime_ns]
+    if recorded == entry:
+        return entry
+    # No usable manifest entry (or the file was touched): compare contents
+    with open(file_path, "rb") as file:
+        return entry if file.read() == data else None
+
+
+# Write the rendered files of a vehicle, skipping files whose bytes already
+# match. Returns the (label, path) pairs and the written, unchanged and
+# orphaned (in the previous manifest but no longer generated) counts.
+def write_vehicle_files_incremental(base_path, rendered_files, metrics=None):
+    previous = read_vehicle_manifest(base_path)
+    if previous is None:
+        create_vehicle_folders(base_path, metrics)
+        previous = {}
+    files = {}
+    generated = []
+    written = unchanged = 0
+    for rendered in rendered_files:
+        start = time.perf_counter_ns()
+        relpath = "/".join(rendered.folder + (rendered.filename,))
+        file_path = os.path.join(base_path, *rendered.folder, rendered.filename)
+        digest = content_digest(rendered.data)
+        entry = _unchanged_entry(file_path, rendered.data, digest, previous.get(relpath))
+        if entry is None:
+            write_bytes(file_path, rendered.data)
+            entry = [len(rendered.data), digest, os.stat(file_path).st_mtime_ns]
+            written += 1
+            stage = "write"
+        else:
+            unchanged += 1
+            stage = "check"
+        files[relpath] = entry
+        generated.append((rendered.label, file_path))
+        if metrics is not None:
+            metrics.record(stage, time.perf_counter_ns() - start, len(rendered.data), rendered.kind)
+    if files != previous:
+        start = time.perf_counter_ns()
+        write_vehicle_manifest(base_path, files)
+        if metrics is not None:
+            metrics.record("manifest", time.perf_counter_ns() - start)
+    orphaned = len(previous.keys() - files.keys())
+    return generated, written, unchanged, orphaned
+
+
+# Outcome of generating one vehicle: its folder, the (label, path) pairs of
+# its files, how many files were written, already up to date or orphaned and
+# the size in bytes of each file (in the order of files)
+VehicleResult = namedtuple("VehicleResult", ["base_path", "files", "written", "unchanged", "orphaned", "sizes"])
+
+
+# Create the folder structure and all files of one vehicle under output_dir
+# (the current directory by default). With incremental, files whose bytes
+# have not changed are left alone (see write_vehicle_files_incremental).
+# With archive ("zip", "tar", "tgz", "txz" or "ar") the vehicle is written
+# to a single archive in output_dir instead, and with sink it is added to an
+# already open archive (under a folder named after the vehicle unless the
+# format keeps every vehicle at the root, like .ar). With store ("hardlink"
+# or "reflink") the vehicle's files are links into a content-addressed
+# store in output_dir (see mm2store). With atomic the vehicle folder is
+# generated aside and published in one rename, with the given durability
+# (see mm2publish). seed takes the tune files from a vehicle in an .ar
+# archive (see seed_overrides) and overrides replaces files by kind (see
+# render_vehicle_files). metrics is an optional mm2metrics.Metrics that
+# records the time and bytes of each stage.
+def generate_vehicle(vehicle_name, description, colors, output_dir=None, newline=os.linesep, file_kinds=None,
+                     incremental=False, archive=None, sink=None, seed=None, metrics=None, store=None, atomic=False,
+                     durability="none", overrides=None):
+    start = time.perf_counter_ns()
+    result = _generate_vehicle(vehicle_name, description, colors, output_dir, newline, file_kinds,
+                               incremental, archive, sink, seed, metrics, store, atomic, durability, overrides)
+    if metrics is not None:
+        metrics.record("vehicle", time.perf_counter_ns() - start)
+    return result
+
+
+def _generate_vehicle(vehicle_name, description, colors, output_dir, newline, file_kinds,
+                      incremental, archive, sink, seed, metrics, store, atomic, durability, overrides):
+    rendered_files = render_vehicle_files(vehicle_name, description, colors, newline, file_kinds, seed, metrics,
+                                          overrides)
+    sizes = [len(rendered.data) for rendered in rendered_files]
+    if sink is not None:
+        prefix = vehicle_name + "/" if sink.per_vehicle_folder else ""
+        files = emit_vehicle(sink, rendered_files, prefix, file_kinds, metrics)
+        return VehicleResult(vehicle_name, files, len(files), 0, 0, sizes)
+    if archive:
+        from mm2output import ARCHIVE_EXTENSIONS, open_archive
+        archive_path = os.path.join(output_dir or os.getcwd(), vehicle_name + ARCHIVE_EXTENSIONS[archive])
+        archive_sink = open_archive(archive_path, archive)
+        try:
+            with archive_sink:
+                files = emit_vehicle(archive_sink, rendered_files, file_kinds=file_kinds, metrics=metrics)
+        except BaseException:
+            # Do not leave a truncated archive behind
+            try:
+                os.remove(archive_path)
+            except OSError:
+                pass
+            raise
+        return VehicleResult(archive_path, files, len(files), 0, 0, sizes)
+    base_path = os.path.join(output_dir or os.getcwd(), vehicle_name)
+    if store:
+        from mm2store import open_store
+        content_store = open_store(output_dir or os.getcwd(), store)
+        files = emit_vehicle(content_store, rendered_files, vehicle_name + "/", file_kinds, metrics)
+        return VehicleResult(base_path, [(label, content_store.path(name)) for label, name in files], len(files), 0, 0, sizes)
+    if incremental:
+        return VehicleResult(base_path, *write_vehicle_files_incremental(base_path, rendered_files, metrics), sizes)
+    if atomic:
+        from mm2publish import publish_vehicle
+        files = publish_vehicle(output_dir or os.getcwd(), vehicle_name, rendered_files, durability, file_kinds, metrics)
+        return VehicleResult(base_path, files, len(files), 0, 0, sizes)
+    create_vehicle_folders(base_path, metrics, file_kinds)
+    files = write_vehicle_files(base_path, rendered_files, metrics)
+    return VehicleResult(base_path, files, len(files), 0, 0, sizes)
@@ -0,0 +1,205 @@
+"""Batched formatting of the numbers in tune files.
+
+Tune files write their numbers as %.6f, and integer fields as %d. Formatting
+millions of values one at a time costs a Python call each, so this module
+formats whole vectors with NumPy instead: the values are scaled to whole
+millionths and their digits are written into a byte matrix one digit
+position at a time, every value at once.
+
+The bytes are the same as "%.6f" % value (or "%d" % value). A product
+value * 1e6 that lies too close to a rounding boundary for float64 to
+decide, a value too large to scale, and nan and inf are formatted by
+Python instead. Without NumPy every function falls back to one bytes
+%-format per call.
+"""
+import functools
+
+_SCALE = 10 ** 6
+# Values below this scale to millionths well inside float64's exact integers
+_LIMIT = 2.0 ** 52 / _SCALE
+# Rows of a render_rows chunk are kept to about this many bytes
+_CHUNK_BYTES = 1 << 22
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+# Format for bytes % that joins segments around the values: segments[0],
+# value 0, segments[1], ..., with %d for the integer ones
+def percent_format(segments, integer):
+    parts = [segments[0].replace(b"%", b"%%")]
+    for is_integer, segment in zip(integer, segments[1:]):
+        parts.append(b"%d" if is_integer else b"%.6f")
+        parts.append(segment.replace(b"%", b"%%"))
+    return b"".join(parts)
+
+
+# Two characters as uint16, indexed by a number and a state: the digits of
+# 0..99, then the same without a leading zero (the highest digits of a
+# value), then two NULs (in front of a value). After them come a digit and
+# "." for %.6f and the digit alone for %d.
+@functools.lru_cache(maxsize=None)
+def _pairs(np):
+    return np.frombuffer(
+        b"".join(b"%02d" % i for i in range(100))
+        + b"".join((b"%2d" % i).replace(b" ", b"\x00") for i in range(100))
+        + b"\x00\x00" * 100
+        + b"".join(b"%d." % i for i in range(10))
+        + b"".join(b"%d\x00" % i for i in range(10)),
+        dtype=np.uint16,
+    )
+
+
+# Text of a flat float64 vector as a byte matrix, a row per value with NULs
+# around the text, and the length of every text. integer is a bool per
+# value (or one for all) choosing %d over %.6f. Every row is laid out as
+# sign and whole digits, ".", six decimals, written two characters at a
+# time; integers have NULs from the "." on.
+def _char_matrix(np, values, integer):
+    integer = np.broadcast_to(np.asarray(integer, dtype=bool), values.shape)
+    magnitude = np.abs(values)
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = magnitude * _SCALE
+        rounded = np.rint(scaled)
+        # value * 1e6 is off the exact product by at most a relative 2**-53,
+        # which decides the rounding only away from a half
+        ambiguous = np.abs(np.abs(scaled - rounded) - 0.5) <= scaled * 2.0 ** -50
+        fallback = ~np.isfinite(values) | (magnitude >= _LIMIT) | (ambiguous & ~integer)
+        if integer.any():
+            rounded = np.where(integer, np.trunc(magnitude) * _SCALE, rounded)
+    rounded[fallback] = 0
+    whole, fraction = np.divmod(rounded.astype(np.int64), _SCALE)
+    top = int(whole.max(initial=0))
+    if top < 1 << 32:
+        whole = whole.astype(np.uint32)
+    digits = np.ones(values.shape, dtype=np.int64)
+    power = 10
+    while power <= top:
+        digits += whole >= power
+        power *= 10
+    # Pairs of whole digits in front of the one sharing a pair with ".",
+    # with room for the sign
+    pairs = int(digits.max(initial=1)) // 2 + 1
+    width = 2 * pairs + 8
+
+    table = _pairs(np)
+    cells = np.empty((len(values), pairs + 4), dtype=np.uint16)
+    # Integers have no decimals: their fraction pairs are NULs
+    state = integer * 200
+    fraction = fraction.astype(np.int32)
+    high, low = np.divmod(fraction, 100)
+    cells[:, -1] = table[low + state]
+    high, low = np.divmod(high, 100)
+    cells[:, -2] = table[low + state]
+    cells[:, -3] = table[high + state]
+    whole, last = np.divmod(whole, 10)
+    cells[:, -4] = table[last + 300 + integer * 10]
+    for pair in range(pairs):
+        ahead = whole == 0
+        whole, low = np.divmod(whole, 100)
+        cells[:, -5 - pair] = table[low + 100 * ahead + 100 * (whole == 0)]
+    chars = cells.view(np.uint8)
+    # %d drops the sign of values that truncate to 0, %.6f keeps it
+    negative = np.signbit(values) & ((digits > 1) | (last > 0) | ~integer) & ~fallback
+    start = width - 7 - digits - negative
+    chars[negative, start[negative]] = ord("-")
+    lengths = np.where(integer, width - 7, width) - start
+    for i in np.flatnonzero(fallback).tolist():
+        text = (b"%d" if integer[i] else b"%.6f") % values[i]
+        if len(text) > width:
+            chars = np.pad(chars, ((0, 0), (len(text) - width, 0)))
+            width = len(text)
+        chars[i] = 0
+        chars[i, width - len(text):] = np.frombuffer(text, dtype=np.uint8)
+        lengths[i] = len(text)
+    return chars, lengths
+
+
+# The formatted values as a list of bytes, like ["%.6f" % v for v in values]
+def format_fixed(values, integer=False):
+    np = _numpy()
+    if np is None:
+        fmt = b"%d" if integer else b"%.6f"
+        return [fmt % value for value in values]
+    values = np.asarray(values, dtype=np.float64).ravel()
+    chars, lengths = _char_matrix(np, values, integer)
+    blob = chars[chars != 0].tobytes()
+    ends = np.cumsum(lengths).tolist()
+    return [blob[first:last] for first, last in zip([0] + ends, ends)]
+
+
+# The values joined by sep as one bytes, e.g. the b"2.500000\t0.500000"
+# of a field with several values
+def join_fixed(values, sep=b" ", integer=False):
+    np = _numpy()
+    if np is None or b"\x00" in sep:
+        return sep.join(format_fixed(values, integer))
+    values = np.asarray(values, dtype=np.float64).ravel()
+    chars, lengths = _char_matrix(np, values, integer)
+    # Every value followed by sep, the last sep cut off
+    text = np.empty((len(values), chars.shape[1] + len(sep)), dtype=np.uint8)
+    text[:, :chars.shape[1]] = chars
+    text[:, chars.shape[1]:] = np.frombuffer(sep, dtype=np.uint8)
+    joined = text[text != 0].tobytes()
+    return joined[:len(joined) - len(sep)] if len(values) else b""
+
+
+# Render rows of values into their text. values holds the rows one after
+# the other (a flat sequence such as an array("d"), or a rows x columns
+# NumPy array) and each row becomes segments[0], column 0, segments[1],
+# ..., the last segment. integer flags the %d columns. Yields one bytes
+# per row.
+def render_rows(segments, values, integer):
+    columns = len(integer)
+    if len(segments) != columns + 1:
+        raise ValueError("render_rows needs one segment more than columns")
+    np = _numpy()
+    # Padding is told from text by being NUL, which tune files never contain
+    if np is None or any(b"\x00" in segment for segment in segments):
+        fmt = percent_format(segments, integer)
+        for offset in range(0, len(values), columns):
+            yield fmt % tuple(values[offset:offset + columns])
+        return
+    values = np.asarray(values, dtype=np.float64).reshape(-1, columns)
+    fixed = sum(map(len, segments))
+    chunk = max(1, _CHUNK_BYTES // (fixed + 20 * max(columns, 1)))
+    integer = np.tile(np.asarray(integer, dtype=bool), min(len(values), chunk))
+    layouts = {}
+    for first in range(0, len(values), chunk):
+        block = values[first:first + chunk]
+        count = len(block)
+        chars, lengths = _char_matrix(np, block.ravel(), integer[:block.size])
+        width = chars.shape[1]
+        chars = chars.reshape(count, columns, width)
+        # A line of text per row: the segments with a slot of full width for
+        # every value, then the NULs in front of the values are dropped
+        if width not in layouts:
+            layouts[width] = _slot_layout(np, segments, width)
+        line, offsets = layouts[width]
+        text = np.empty((count, len(line)), dtype=np.uint8)
+        text[:] = line
+        for column, offset in enumerate(offsets):
+            text[:, offset:offset + width] = chars[:, column]
+        blob = text[text != 0].tobytes()
+        ends = np.cumsum(fixed + lengths.reshape(count, columns).sum(axis=1)).tolist()
+        for begin, end in zip([0] + ends, ends):
+            yield blob[begin:end]
+
+
+# The segments joined with a slot of `width` NULs between each two, and
+# where the slots start
+def _slot_layout(np, segments, width):
+    slot = b"\x00" * width
+    line = np.frombuffer(segments[0] + b"".join(slot + segment for segment in segments[1:]), dtype=np.uint8)
+    offsets = []
+    offset = 0
+    for segment in segments[:-1]:
+        offset += len(segment)
+        offsets.append(offset)
+        offset += width
+    return line, offsets
@@ -0,0 +1,160 @@
+import functools
+import os
+import time
+from PyQt5.QtCore import QThreadPool
+from PyQt5.QtWidgets import QApplication, QMainWindow, QMessageBox, QPushButton
+from vp_setup_ui import Ui_MainWindow
+from PyQt5.QtGui import QIcon
+from mm2core import VehicleSpec, normalize_colors, validate_vehicle
+from mm2metrics import export_to_environment, metrics_from_environment
+from mm2worker import GenerationWorker
+
+class VehicleFolderSetup(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.ui = Ui_MainWindow()
+        self.ui.setupUi(self)
+
+        # Connect the OK button to the functionality
+        self.ui.okButton.clicked.connect(self.on_submit)
+
+        # Supply icon to MainWindow
+        self.setWindowIcon(QIcon("_internal\\vpgen.ico"))
+
+        # Files are written on a worker thread, one vehicle at a time, so
+        # the window stays responsive; submitting again while a vehicle is
+        # being generated queues the next one
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.workers = []
+        # Worker -> (index, files written, files) of the vehicle it is on
+        self.current = {}
+        self.cancel_message = "Cancelled"
+
+        # Cancel button in the status bar, shown while generating
+        self.cancelButton = QPushButton("Cancel", self)
+        self.cancelButton.setToolTip("Stop generating after the current file")
+        self.cancelButton.clicked.connect(self.on_cancel)
+        self.cancelButton.hide()
+        self.ui.statusBar.addPermanentWidget(self.cancelButton)
+
+        # Table mode for many vehicles, opened from the status bar
+        self.tableWindow = None
+        self.tableButton = QPushButton("Table...", self)
+        self.tableButton.setToolTip("Generate many vehicles from a table")
+        self.tableButton.clicked.connect(self.on_open_table)
+        self.ui.statusBar.addPermanentWidget(self.tableButton)
+
+    def on_submit(self):
+        # Get input values from the fields
+        vehicle_name = self.ui.vehicleNameInput.text().strip()
+        description = self.ui.descriptionInput.text().strip()
+        variations = self.ui.variationsInput.text().strip()
+
+        # Validate inputs
+        try:
+            validate_vehicle(vehicle_name, description, variations)
+        except ValueError as e:
+            QMessageBox.warning(self, "Input Required", str(e))
+            return
+
+        # Process variations (colours) into a single string
+        colors = normalize_colors(variations)
+
+        # Stage timings, when MM2_METRICS or MM2_METRICS_PROM is set
+        metrics = metrics_from_environment({"source": "gui"})
+
+        self.start_worker([VehicleSpec(vehicle_name, description, colors)], metrics)
+
+    # Queue vehicles for generation in the current folder. Returns the worker.
+    def start_worker(self, specs, metrics=None):
+        worker = GenerationWorker(specs, os.getcwd(), metrics)
+        worker.signals.started.connect(functools.partial(self.on_vehicle_started, worker))
+        worker.signals.progress.connect(functools.partial(self.on_vehicle_progress, worker))
+        worker.signals.vehicle_done.connect(functools.partial(self.on_vehicle_done, worker))
+        worker.signals.vehicle_failed.connect(functools.partial(self.on_vehicle_failed, worker))
+        worker.signals.finished.connect(functools.partial(self.on_worker_finished, worker))
+        self.workers.append(worker)
+        self.cancelButton.show()
+        self.pool.start(worker)
+        return worker
+
+    def on_open_table(self):
+        if self.tableWindow is None:
+            from mm2table import VehicleTableWindow
+            self.tableWindow = VehicleTableWindow(self)
+        self.tableWindow.show()
+        self.tableWindow.raise_()
+        self.tableWindow.activateWindow()
+
+    def on_cancel(self):
+        for worker in self.workers:
+            worker.cancel()
+        self.ui.statusBar.showMessage("Cancelling...")
+
+    def _queued(self):
+        queued = len(self.workers) - 1
+        return f" ({queued} more queued)" if queued > 0 else ""
+
+    def on_vehicle_started(self, worker, index, vehicle_name):
+        self.current[worker] = (index, 0, 0)
+        self.ui.statusBar.showMessage(f"Generating {vehicle_name}...{self._queued()}")
+
+    def on_vehicle_progress(self, worker, index, done, total):
+        self.current[worker] = (index, done, total)
+        self.ui.statusBar.showMessage(f"Generating {worker.specs[index].name}: {done}/{total} files{self._queued()}")
+
+    def on_vehicle_failed(self, worker, index, message):
+        self.current.pop(worker, None)
+        self.ui.statusBar.showMessage(f"{worker.specs[index].name}: failed", 5000)
+        QMessageBox.critical(self, "Error", message)
+
+    def on_vehicle_done(self, worker, index, base_path, generated):
+        self.current.pop(worker, None)
+        self.ui.statusBar.showMessage(f"{worker.specs[index].name}: {len(generated)} files written", 5000)
+
+        # Show success message
+        message_box_start = time.perf_counter_ns()
+        QMessageBox.information(
+            self,
+            "Success",
+            f"Folder structure and configuration files created successfully!\n\n"
+            f"Base Path: {base_path}\n"
+            + "".join(f"{label}: {path}\n" for label, path in generated)
+        )
+        if worker.metrics is not None:
+            worker.metrics.record("message_box", time.perf_counter_ns() - message_box_start)
+            try:
+                export_to_environment(worker.metrics)
+            except OSError as e:
+                QMessageBox.warning(self, "Metrics", f"Failed to export metrics: {e}")
+
+    def on_worker_finished(self, worker, cancelled):
+        self.workers.remove(worker)
+        interrupted = self.current.pop(worker, None)
+        if interrupted:
+            index, done, total = interrupted
+            self.cancel_message = f"Cancelled {worker.specs[index].name} after {done} of {total} files"
+        if cancelled and not self.workers:
+            self.ui.statusBar.showMessage(self.cancel_message, 5000)
+            self.cancel_message = "Cancelled"
+        if not self.workers:
+            self.cancelButton.hide()
+
+    # Let running generation stop at the next file before the window goes
+    def closeEvent(self, event):
+        for worker in self.workers:
+            worker.cancel()
+        self.pool.waitForDone()
+        super().closeEvent(event)
+
+# Start the Qt front end; returns the application's exit code
+def run(argv):
+    app = QApplication(argv)
+    # Set application metadata
+    app.setApplicationName("MM2 Structure Generator")
+    app.setOrganizationName("Chassey Blue")
+    app.setOrganizationDomain("https://chasseyblue.com")
+    window = VehicleFolderSetup()
+    window.show()
+    return app.exec_()
@@ -0,0 +1,107 @@
+"""Checkpoint journal for resumable batch runs.
+
+The journal is an append-only JSON lines file next to the batch output. Its
+first line names the manifest and output folder; then every vehicle gets a
+"start" record when it is handed out for generation and a "done" or
+"failed" record when its result comes back. Records are flushed as they are
+written, so a crashed or killed process loses nothing, and fsynced at most
+every sync_interval seconds (and on close), which bounds what a power loss
+can take back.
+
+On resume, vehicles with a "done" record are skipped. Vehicles that were
+started but never finished were in flight when the run died and may be
+half-written; they are generated again, which overwrites every one of their
+files, after their staging folders and temporary files are removed (see
+mm2publish.discard_leftovers). A torn last line is ignored.
+"""
+import json
+import os
+import time
+
+JOURNAL_VERSION = 1
+
+
+class Journal:
+    def __init__(self, path, manifest_path, output_dir, resume=False, sync_interval=1.0):
+        self.path = path
+        self.sync_interval = sync_interval
+        header = {"journal": JOURNAL_VERSION, "manifest": os.path.abspath(manifest_path), "output": os.path.abspath(output_dir)}
+        # line number -> vehicle name
+        self.done = {}
+        self.in_flight = {}
+        self._last_sync = time.monotonic()
+        if resume and os.path.exists(path):
+            recorded, self.done, self.in_flight = read_journal(path)
+            if recorded is None or {key: recorded.get(key) for key in header} != header:
+                raise ValueError(f"Journal '{path}' was not written for this manifest and output folder")
+            self._file = open(path, "a", encoding="utf-8", newline="\n")
+            # Start after a torn last line rather than on it
+            with open(path, "rb") as journal:
+                journal.seek(-1, os.SEEK_END)
+                if journal.read(1) != b"\n":
+                    self._file.write("\n")
+        else:
+            self._file = open(path, "w", encoding="utf-8", newline="\n")
+            self._write(header)
+
+    # True when the vehicle on line_num finished in an earlier run
+    def is_done(self, line_num, vehicle_name):
+        return self.done.get(line_num) == vehicle_name
+
+    def started(self, line_num, vehicle_name):
+        self._write({"event": "start", "line": line_num, "vehicle": vehicle_name})
+
+    def finished(self, line_num, vehicle_name, error=None):
+        if error:
+            self._write({"event": "failed", "line": line_num, "vehicle": vehicle_name, "error": error})
+        else:
+            self._write({"event": "done", "line": line_num, "vehicle": vehicle_name})
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Read a journal: returns the header (None if unreadable) and the finished
+# and in-flight vehicles as {line number: vehicle name}
+def read_journal(path):
+    header = None
+    done = {}
+    in_flight = {}
+    with open(path, encoding="utf-8") as journal:
+        for line in journal:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Torn write at the end of a crashed run
+                continue
+            event = record.get("event")
+            if header is None and event is None:
+                header = record
+            elif event == "start":
+                in_flight[record["line"]] = record["vehicle"]
+            elif event in ("done", "failed"):
+                in_flight.pop(record["line"], None)
+                if event == "done":
+                    done[record["line"]] = record["vehicle"]
+                else:
+                    done.pop(record["line"], None)
+    return header, done, in_flight
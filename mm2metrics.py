@@ -0,0 +1,163 @@
+"""Timing and size metrics for vehicle generation.
+
+A Metrics object is handed to the generation functions (metrics=...) and
+records, per stage and file kind, how often the stage ran, how long it
+took in total and at most (monotonic clock, nanoseconds) and how many
+bytes it handled. Stages are:
+
+    vehicle     one whole vehicle
+    makedirs    creating the folder structure
+    render      rendering a file kind
+    write       writing a file kind to disk
+    check       comparing an up to date file (incremental runs)
+    manifest    writing the incremental manifest
+    archive     adding a file kind to an archive or the content store
+    publish     renaming a staged vehicle folder into place (atomic output)
+    message_box the GUI's result dialog (until it is closed)
+
+Runs are exported as JSON lines (one line appended per run) or as a
+Prometheus textfile for node_exporter's textfile collector. profiling()
+adds an opt-in cProfile or tracemalloc pass around a run.
+"""
+import contextlib
+import json
+import os
+import time
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+
+class Metrics:
+    def __init__(self, labels=None):
+        self.labels = dict(labels or {})
+        # (stage, kind) -> [calls, total ns, max ns, bytes]
+        self.stages = {}
+        # Single values of the run, e.g. the tracemalloc peak
+        self.gauges = {}
+        self.timestamp = time.time()
+
+    def record(self, stage, elapsed_ns, nbytes=0, kind=""):
+        totals = self.stages.get((stage, kind))
+        if totals is None:
+            totals = self.stages[stage, kind] = [0, 0, 0, 0]
+        totals[0] += 1
+        totals[1] += elapsed_ns
+        if elapsed_ns > totals[2]:
+            totals[2] = elapsed_ns
+        totals[3] += nbytes
+
+    # Time the body of a with statement as one call of stage
+    @contextlib.contextmanager
+    def stage(self, stage, kind=""):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter_ns() - start, kind=kind)
+
+    # Add the stages of another Metrics, e.g. one filled in a worker process
+    def merge(self, other):
+        for key, (calls, total, peak, nbytes) in other.stages.items():
+            totals = self.stages.setdefault(key, [0, 0, 0, 0])
+            totals[0] += calls
+            totals[1] += total
+            totals[2] = max(totals[2], peak)
+            totals[3] += nbytes
+        self.gauges.update(other.gauges)
+
+    def as_dict(self):
+        return {
+            "timestamp": self.timestamp,
+            "labels": self.labels,
+            "stages": [
+                {
+                    "stage": stage, "kind": kind, "calls": calls, "seconds": total / 1e9,
+                    "max_seconds": peak / 1e9, "bytes": nbytes,
+                }
+                for (stage, kind), (calls, total, peak, nbytes) in sorted(self.stages.items())
+            ],
+            "gauges": self.gauges,
+        }
+
+    # Append this run as one JSON line
+    def write_jsonl(self, path):
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(self.as_dict(), separators=(",", ":")) + "\n")
+
+    # Write this run in the Prometheus text format. The file is replaced
+    # atomically so the textfile collector never sees half of it.
+    def write_prometheus(self, path, prefix="mm2"):
+        extra = "".join(f',{name}="{_escape(value)}"' for name, value in sorted(self.labels.items()))
+        lines = []
+        for metric, column, scale, help_text in (
+            ("stage_calls", 0, 1, "Number of times a generation stage ran in the last run."),
+            ("stage_seconds", 1, 1e9, "Time spent in a generation stage in the last run."),
+            ("stage_max_seconds", 2, 1e9, "Longest single call of a generation stage in the last run."),
+            ("stage_bytes", 3, 1, "Bytes handled by a generation stage in the last run."),
+        ):
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} gauge")
+            for (stage, kind), totals in sorted(self.stages.items()):
+                value = totals[column] / scale if scale != 1 else totals[column]
+                lines.append(f'{prefix}_{metric}{{stage="{_escape(stage)}",kind="{_escape(kind)}"{extra}}} {value}')
+        for name, value in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name}{{{extra.lstrip(',')}}} {value}")
+        lines.append(f"# TYPE {prefix}_last_run_timestamp_seconds gauge")
+        lines.append(f"{prefix}_last_run_timestamp_seconds{{{extra.lstrip(',')}}} {self.timestamp}")
+        with open(path + ".tmp", "w", encoding="utf-8", newline="\n") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(path + ".tmp", path)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Profile the body of a with statement. "cprofile" dumps pstats data to
+# output (open it with python -m pstats), "tracemalloc" writes the top
+# allocation sites to output and records the peak as a gauge in metrics.
+# Only the current process is profiled.
+@contextlib.contextmanager
+def profiling(mode, output, metrics=None):
+    if mode == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(output)
+    elif mode == "tracemalloc":
+        import tracemalloc
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            if metrics is not None:
+                metrics.gauges["tracemalloc_peak_bytes"] = peak
+            with open(output, "w", encoding="utf-8") as file:
+                file.write(f"Peak traced memory: {peak} bytes\n\n")
+                for stat in snapshot.statistics("lineno")[:30]:
+                    file.write(f"{stat}\n")
+    else:
+        raise ValueError(f"Unknown profile mode '{mode}' (use {', '.join(PROFILE_MODES)})")
+
+
+# Metrics for the GUI, enabled by setting MM2_METRICS (JSON lines file)
+# and/or MM2_METRICS_PROM (Prometheus textfile). Returns None otherwise.
+def metrics_from_environment(labels=None):
+    if os.environ.get("MM2_METRICS") or os.environ.get("MM2_METRICS_PROM"):
+        return Metrics(labels)
+    return None
+
+
+def export_to_environment(metrics):
+    if os.environ.get("MM2_METRICS"):
+        metrics.write_jsonl(os.environ["MM2_METRICS"])
+    if os.environ.get("MM2_METRICS_PROM"):
+        metrics.write_prometheus(os.environ["MM2_METRICS_PROM"])
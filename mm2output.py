@@ -0,0 +1,123 @@
+"""Archive output backends for generated vehicles.
+
+Vehicles can be streamed straight into a zip, tar or MM2 .ar archive (see
+mm2ar) instead of loose files. A sink takes posix paths relative to the
+archive root:
+
+    with open_archive("fleet.zip") as sink:
+        rendered_files = render_vehicle_files("vpbullet", "Ford Mustang", "Red|Blue")
+        emit_vehicle(sink, rendered_files, "vpbullet/")
+
+render_vehicle_files and emit_vehicle are in mm2core.
+"""
+import io
+import os
+import time
+
+# zipfile, tarfile and mm2ar are imported when a sink is opened, as they are
+# most of the import time of the headless tools otherwise
+
+# Archive format by file extension (longest match first)
+ARCHIVE_FORMATS = (
+    (".tar.gz", "tgz"),
+    (".tgz", "tgz"),
+    (".tar.xz", "txz"),
+    (".tar", "tar"),
+    (".zip", "zip"),
+    (".ar", "ar"),
+)
+ARCHIVE_EXTENSIONS = {"zip": ".zip", "tar": ".tar", "tgz": ".tar.gz", "txz": ".tar.xz", "ar": ".ar"}
+
+
+def archive_format(path):
+    lower = path.lower()
+    for extension, fmt in ARCHIVE_FORMATS:
+        if lower.endswith(extension):
+            return fmt
+    raise ValueError(f"Unknown archive type for '{path}' (use {', '.join(ext for ext, _ in ARCHIVE_FORMATS)})")
+
+
+class ZipSink:
+    # Vehicles of a batch archive each get a folder of their own
+    per_vehicle_folder = True
+
+    # compression defaults to zipfile.ZIP_DEFLATED
+    def __init__(self, file, compression=None):
+        import zipfile
+        if compression is None:
+            compression = zipfile.ZIP_DEFLATED
+        self.archive = zipfile.ZipFile(file, "w", compression)
+        self.date_time = time.localtime()[:6]
+
+    def add_dir(self, name):
+        import zipfile
+        info = zipfile.ZipInfo(name.rstrip("/") + "/", self.date_time)
+        info.external_attr = 0o40755 << 16 | 0x10
+        self.archive.writestr(info, b"")
+
+    def add_file(self, name, data):
+        import zipfile
+        info = zipfile.ZipInfo(name, self.date_time)
+        info.compress_type = self.archive.compression
+        info.external_attr = 0o644 << 16
+        self.archive.writestr(info, data)
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TarSink:
+    per_vehicle_folder = True
+    _MODES = {"tar": "w", "tgz": "w:gz", "txz": "w:xz"}
+
+    def __init__(self, file, fmt="tar"):
+        import tarfile
+        if isinstance(file, (str, os.PathLike)):
+            self.archive = tarfile.open(file, self._MODES[fmt], format=tarfile.PAX_FORMAT)
+        else:
+            self.archive = tarfile.open(fileobj=file, mode=self._MODES[fmt], format=tarfile.PAX_FORMAT)
+        self.mtime = int(time.time())
+
+    def add_dir(self, name):
+        import tarfile
+        info = tarfile.TarInfo(name.rstrip("/"))
+        info.type = tarfile.DIRTYPE
+        info.mode = 0o755
+        info.mtime = self.mtime
+        self.archive.addfile(info)
+
+    def add_file(self, name, data):
+        import tarfile
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mode = 0o644
+        info.mtime = self.mtime
+        self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Open a sink for path, picking the format from its extension unless given
+def open_archive(path, fmt=None):
+    fmt = fmt or archive_format(path)
+    if fmt == "zip":
+        return ZipSink(path)
+    if fmt == "ar":
+        from mm2ar import ArSink
+        return ArSink(path)
+    if fmt in TarSink._MODES:
+        return TarSink(path, fmt)
+    raise ValueError(f"Unknown archive format '{fmt}'")
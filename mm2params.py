@@ -0,0 +1,257 @@
+"""Compact storage for the tune values of many vehicles.
+
+A Schema is the fixed layout of one tune file kind, taken from parsing its
+template once: every number in the file gets a slot, in file order, named by
+its dotted path, with [index] for fields of several values:
+
+    vehCarSim.Mass
+    vehCarSim.Engine.MaxHorsePower
+    vehCarSim.Trans.GearRatios[2]
+
+A ParamTable keeps the values of any number of vehicles in one flat
+array("d"), a row of doubles per vehicle (integer fields hold whole
+numbers). That is 8 bytes per value where a dict of floats per block costs
+closer to 100, so 100k vehCarSim files take about 80 MB. ParamTable.to_numpy
+returns the same buffer as a NumPy structured array, without copying, for
+vectorized changes.
+
+Rows are read and changed through VehicleParams views. A single row is
+rendered with one bytes %-format, the schema's text with %.6f (or %d for
+integer fields) where the values go, and whole tables by mm2format, which
+formats the values of many rows at once. An unchanged row renders to the
+bytes of the template; values are written as %.6f like mm2tune writes
+changed values.
+"""
+import array
+import functools
+import os
+import mm2format
+import mm2tune
+from mm2core import get_file_kinds
+
+
+# (dotted path, Field) of every field below block, in file order
+def _fields(block, prefix=""):
+    for item in block:
+        if isinstance(item, mm2tune.Block):
+            yield from _fields(item, f"{prefix}{item.name}.")
+        elif isinstance(item, mm2tune.Field):
+            yield prefix + item.key, item
+
+
+# Slot names, integer flags and values of the numbers in a parsed tune file
+def _slots(document):
+    names, integer, values = [], [], []
+    for path, field in _fields(document):
+        for i, value in enumerate(field.values):
+            if isinstance(value, str):
+                continue
+            names.append(path if len(field.values) == 1 else f"{path}[{i}]")
+            integer.append(isinstance(value, int))
+            values.append(value)
+    return names, integer, values
+
+
+# The text of a parsed tune file split around the numbers of the slots in
+# `selected` (all slots when None): the segments, and the names of the
+# slots between them in file order. The other numbers keep their text.
+def _split(document, selected=None):
+    names = []
+    for path, field in _fields(document):
+        values = list(field.values)
+        for i, value in enumerate(values):
+            if isinstance(value, str):
+                continue
+            name = path if len(values) == 1 else f"{path}[{i}]"
+            if selected is None or name in selected:
+                # Tune files never contain NUL, so it marks where the value goes
+                values[i] = "\x00"
+                names.append(name)
+        field.values = values
+    return document.to_bytes().split(b"\x00"), names
+
+
+class Schema:
+    __slots__ = ("kind", "names", "integer", "defaults", "index", "segments", "_format", "_data")
+
+    # Layout of the tune file kind `kind` from the bytes of one such file
+    def __init__(self, kind, data):
+        data = bytes(data)
+        if b"\x00" in data:
+            raise ValueError(f"The {kind} file cannot be used as a layout (it contains NUL bytes)")
+        document = mm2tune.parse(data)
+        names, integer, values = _slots(document)
+        if len(set(names)) != len(names):
+            raise ValueError(f"The {kind} file has fields with the same path")
+        self.kind = kind
+        self.names = tuple(names)
+        self.integer = tuple(integer)
+        self.defaults = array.array("d", values)
+        self.index = {name: i for i, name in enumerate(names)}
+        self.segments = _split(document)[0]
+        self._format = mm2format.percent_format(self.segments, self.integer)
+        self._data = data
+
+    def __repr__(self):
+        return f"Schema({self.kind!r}, {len(self.names)} values)"
+
+    def __len__(self):
+        return len(self.names)
+
+    # Values of a file of this kind in slot order. The file must have the
+    # same fields as the schema; its spacing is not kept.
+    def values_of(self, data):
+        names, integer, values = _slots(mm2tune.parse(data))
+        if tuple(names) != self.names:
+            raise ValueError(f"The {self.kind} file does not have the fields of its template")
+        return values
+
+    # The file for a sequence of values in slot order
+    def render(self, values):
+        return self._format % tuple(values)
+
+    # Segments like those of the schema, but around the slots in names only;
+    # the other numbers are kept as the file has them. Returns the segments
+    # and the selected slot names in file order.
+    def select(self, names):
+        unknown = set(names) - self.index.keys()
+        if unknown:
+            raise KeyError(f"{self.kind} has no value {min(unknown)}")
+        return _split(mm2tune.parse(self._data), set(names))
+
+    # NumPy dtype of a row: one float64 field per slot
+    def dtype(self):
+        import numpy
+        return numpy.dtype([(name, "f8") for name in self.names])
+
+
+@functools.lru_cache(maxsize=None)
+def _template_schema(kind, newline, file_kinds):
+    for file_kind in get_file_kinds(file_kinds):
+        if file_kind.kind == kind:
+            if file_kind.params:
+                raise ValueError(f"The {kind} file is not a tune file")
+            return Schema(kind, file_kind.render({}, newline))
+    raise ValueError(f"Unknown file kind '{kind}'")
+
+
+# Schema of a tune file kind from its template, or from base (bytes of a
+# file of that kind, e.g. from a seed archive) when given
+def schema_for(kind, newline=os.linesep, file_kinds=None, base=None):
+    if base is not None:
+        return Schema(kind, base)
+    return _template_schema(kind, newline, file_kinds)
+
+
+class VehicleParams:
+    # View of one row of a ParamTable; values are read and written in the
+    # table's buffer
+    __slots__ = ("table", "row")
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    def __repr__(self):
+        return f"VehicleParams({self.table.schema.kind!r}, row {self.row})"
+
+    def _offset(self, name):
+        try:
+            return self.row * len(self.table.schema) + self.table.schema.index[name]
+        except KeyError:
+            raise KeyError(f"{self.table.schema.kind} has no value {name}") from None
+
+    def __getitem__(self, name):
+        offset = self._offset(name)
+        value = self.table.values[offset]
+        return int(value) if self.table.schema.integer[self.table.schema.index[name]] else value
+
+    def __setitem__(self, name, value):
+        offset = self._offset(name)
+        self.table.values[offset] = round(value) if self.table.schema.integer[self.table.schema.index[name]] else value
+
+    def __contains__(self, name):
+        return name in self.table.schema.index
+
+    def keys(self):
+        return self.table.schema.names
+
+    def update(self, values):
+        for name, value in values.items():
+            self[name] = value
+
+    def to_bytes(self):
+        return self.table.render(self.row)
+
+
+class ParamTable:
+    __slots__ = ("schema", "values")
+
+    def __init__(self, schema, rows=0):
+        self.schema = schema
+        self.values = schema.defaults * rows
+
+    def __repr__(self):
+        return f"ParamTable({self.schema.kind!r}, {len(self)} rows)"
+
+    def __len__(self):
+        return len(self.values) // len(self.schema) if len(self.schema) else 0
+
+    def __getitem__(self, row):
+        rows = len(self)
+        if row < 0:
+            row += rows
+        if not 0 <= row < rows:
+            raise IndexError("ParamTable row out of range")
+        return VehicleParams(self, row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield VehicleParams(self, row)
+
+    # Add a row of template values, changed by values ({name: value}) if
+    # given, and return its view
+    def append(self, values=None):
+        self.values.extend(self.schema.defaults)
+        params = VehicleParams(self, len(self) - 1)
+        if values:
+            params.update(values)
+        return params
+
+    # Add a row holding the values of a tune file of this kind
+    def append_file(self, data):
+        self.values.extend(array.array("d", self.schema.values_of(data)))
+        return VehicleParams(self, len(self) - 1)
+
+    # The values of one slot over all rows
+    def column(self, name):
+        return self.values[self.schema.index[name]::len(self.schema)]
+
+    # Set a slot in every row from a sequence with a value per row
+    def set_column(self, name, values):
+        index = self.schema.index[name]
+        if self.schema.integer[index]:
+            values = [round(value) for value in values]
+        self.values[index::len(self.schema)] = array.array("d", values)
+
+    # The file of one row, formatted straight from the buffer
+    def render(self, row):
+        width = len(self.schema)
+        return self.schema.render(self.values[row * width:(row + 1) * width])
+
+    # The file of every row, formatted a chunk of rows at a time (see
+    # mm2format.render_rows)
+    def render_rows(self):
+        return mm2format.render_rows(self.schema.segments, self.values, self.schema.integer)
+
+    # The buffer as a NumPy structured array (one record per row) sharing
+    # its memory; the table cannot grow while the array is alive
+    def to_numpy(self):
+        import numpy
+        return numpy.frombuffer(self.values, dtype=self.schema.dtype())
+
+
+# Overrides for mm2core.generate_vehicle: the files of row `row` of every
+# table ({kind: bytes})
+def vehicle_overrides(tables, row):
+    return {table.schema.kind: table.render(row) for table in tables}
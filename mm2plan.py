@@ -0,0 +1,168 @@
+"""Dry runs: what a batch would create, without writing anything.
+
+plan_vehicles renders every vehicle of a manifest in memory and compares
+the result with what is on disk, read with one os.scandir pass over the
+vehicle folders that already exist. The returned Plan lists the folders to
+create, the files to write with their sizes, the existing files that would
+be overwritten and the conflicts (a file where a folder is needed, or the
+other way round, and vehicles named twice). It can be written out as a
+listing to inspect or diff and then executed as it is.
+
+Rendered files are kept until the plan is executed; files without
+parameters are the same bytes object for every vehicle, so this is mostly
+the .info and audio CSV files.
+"""
+import os
+import time
+from collections import namedtuple
+from mm2core import render_vehicle_files, vehicle_dirs, write_bytes
+
+# path is relative to the output folder and "/" separated. exists is None
+# for new files and folders, otherwise the size of the existing file (0 for
+# folders). Files also carry their vehicle, label and contents.
+PlannedDir = namedtuple("PlannedDir", ["path", "exists"])
+PlannedFile = namedtuple("PlannedFile", ["path", "size", "exists", "vehicle", "label", "data"])
+
+
+class Plan:
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.vehicles = []
+        self.dirs = []
+        self.files = []
+        # (path, reason)
+        self.conflicts = []
+        # (line number, vehicle name or None, error message)
+        self.errors = []
+
+    @property
+    def new_dirs(self):
+        return [planned for planned in self.dirs if planned.exists is None]
+
+    @property
+    def overwrites(self):
+        return [planned for planned in self.files if planned.exists is not None]
+
+    @property
+    def bytes_to_write(self):
+        return sum(planned.size for planned in self.files)
+
+    def summary(self):
+        return (
+            f"Plan: {len(self.vehicles)} vehicles, {len(self.new_dirs)} folders to create, "
+            f"{len(self.files)} files to write ({self.bytes_to_write / 1e6:.1f} MB), "
+            f"{len(self.overwrites)} existing files overwritten, {len(self.conflicts)} conflicts, "
+            f"{len(self.errors)} invalid rows"
+        )
+
+    # One tab separated line per operation, in the order they are executed:
+    # mkdir, write (new file, size), overwrite (size, existing size),
+    # conflict (reason) and error (manifest line, message)
+    def write_listing(self, file):
+        for planned in self.new_dirs:
+            file.write(f"mkdir\t{planned.path}\n")
+        for planned in self.files:
+            if planned.exists is None:
+                file.write(f"write\t{planned.path}\t{planned.size}\n")
+            else:
+                file.write(f"overwrite\t{planned.path}\t{planned.size}\t{planned.exists}\n")
+        for path, reason in self.conflicts:
+            file.write(f"conflict\t{path}\t{reason}\n")
+        for line_num, vehicle_name, error in self.errors:
+            file.write(f"error\t{line_num}\t" + (f"{vehicle_name}: " if vehicle_name else "") + f"{error}\n")
+
+    # Create the planned folders and write the planned files. Nothing is
+    # written when the plan has conflicts. Returns the (label, path) pairs
+    # of the written files per vehicle name.
+    def execute(self, metrics=None):
+        if self.conflicts:
+            path, reason = self.conflicts[0]
+            raise ValueError(f"The plan has {len(self.conflicts)} conflicts, first '{path}': {reason}")
+        start = time.perf_counter_ns()
+        os.makedirs(self.output_dir, exist_ok=True)
+        for planned in self.new_dirs:
+            try:
+                os.mkdir(self._path(planned.path))
+            except FileExistsError:
+                pass
+        if metrics is not None:
+            metrics.record("makedirs", time.perf_counter_ns() - start)
+        generated = {vehicle_name: [] for vehicle_name in self.vehicles}
+        for planned in self.files:
+            start = time.perf_counter_ns()
+            generated[planned.vehicle].append((planned.label, write_bytes(self._path(planned.path), planned.data)))
+            if metrics is not None:
+                metrics.record("write", time.perf_counter_ns() - start, planned.size)
+        return generated
+
+    def _path(self, path):
+        return os.path.join(self.output_dir, *path.split("/"))
+
+
+# What is under output_dir for the given top-level names, in one scandir
+# pass: {normcased "/" separated path: file size, or None for folders}
+def scan_output(output_dir, names):
+    existing = {}
+    pending = [("", output_dir, names)]
+    while pending:
+        prefix, folder, only = pending.pop()
+        try:
+            entries = os.scandir(folder)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with entries:
+            for entry in entries:
+                key = os.path.normcase(prefix + entry.name)
+                if only is not None and key not in only:
+                    continue
+                if entry.is_dir():
+                    existing[key] = None
+                    pending.append((key + "/", entry.path, None))
+                else:
+                    existing[key] = entry.stat().st_size
+    return existing
+
+
+# Plan the folder output of entries, the (line number, VehicleSpec or
+# ValueError) pairs of mm2batch.read_manifest, under output_dir. newline,
+# file_kinds and seed are as for mm2core.generate_vehicle.
+def plan_vehicles(entries, output_dir, newline=os.linesep, file_kinds=None, seed=None):
+    plan = Plan(output_dir)
+    specs = []
+    first_line = {}
+    for line_num, spec in entries:
+        if isinstance(spec, ValueError):
+            plan.errors.append((line_num, None, str(spec)))
+            continue
+        key = os.path.normcase(spec.name)
+        if key in first_line:
+            plan.conflicts.append((spec.name, f"vehicle named again on line {line_num} (first on line {first_line[key]})"))
+            continue
+        first_line[key] = line_num
+        specs.append((line_num, spec))
+
+    existing = scan_output(output_dir, set(first_line))
+    folders = vehicle_dirs(file_kinds)
+    for line_num, spec in specs:
+        try:
+            rendered_files = render_vehicle_files(spec.name, spec.description, spec.colors, newline, file_kinds, seed)
+        except Exception as e:
+            plan.errors.append((line_num, spec.name, str(e)))
+            continue
+        plan.vehicles.append(spec.name)
+        for folder in ("",) + folders:
+            path = spec.name + "/" + folder if folder else spec.name
+            key = os.path.normcase(path)
+            if key in existing and existing[key] is not None:
+                plan.conflicts.append((path, "is a file, a folder is needed"))
+            plan.dirs.append(PlannedDir(path, 0 if key in existing else None))
+        for rendered in rendered_files:
+            path = "/".join((spec.name,) + rendered.folder + (rendered.filename,))
+            key = os.path.normcase(path)
+            exists = None
+            if key in existing:
+                if existing[key] is None:
+                    plan.conflicts.append((path, "is a folder, a file is needed"))
+                exists = existing[key] or 0
+            plan.files.append(PlannedFile(path, len(rendered.data), exists, spec.name, rendered.label, rendered.data))
+    return plan
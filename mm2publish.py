@@ -0,0 +1,174 @@
+"""Atomic publishing of vehicle folders.
+
+A new vehicle is generated into a staging folder below
+<output>/.mm2staging and then renamed into place, so the vehicle folder
+either does not exist or holds every file: a failure or cancellation
+halfway leaves nothing behind but the staging folder, which is removed.
+A vehicle folder that already exists (it may hold geometry and textures)
+cannot be replaced in one rename; there every file is written to a
+temporary name and os.replace'd over the old one, so each file is old or
+new, never half-written.
+
+Durability decides what survives a power loss or OS crash:
+
+    none     nothing is fsynced; the OS writes the data back in its own time
+    vehicle  the files and folders of each vehicle are fsynced before the
+             rename and the output folder after it, so a vehicle that was
+             reported done is on disk (the slowest mode)
+    batch    nothing per vehicle; everything written is flushed once when
+             the batch ends (finish_batch)
+
+Staging folders and temporary files left by a killed process can be
+deleted; a resumed batch does so for the vehicles it generates again
+(discard_leftovers).
+"""
+import glob
+import os
+import re
+import shutil
+import threading
+import time
+from mm2core import create_vehicle_folders, vehicle_dirs, write_bytes, write_vehicle_files
+
+STAGING_DIR = ".mm2staging"
+# Temporary names of replace_vehicle_files and the store: <name>.<pid>.<thread>.tmp
+_TEMPORARY = re.compile(r".+\.\d+\.\d+\.tmp")
+DURABILITY_MODES = ("none", "vehicle", "batch")
+
+
+# Whether the files themselves are fsynced when written: per vehicle, or in
+# batch mode where there is no os.sync to flush everything at the end
+def _sync_files(durability):
+    if durability not in DURABILITY_MODES:
+        raise ValueError(f"Unknown durability '{durability}' (use {', '.join(DURABILITY_MODES)})")
+    return durability == "vehicle" or (durability == "batch" and not hasattr(os, "sync"))
+
+
+# fsync a folder so the entries created in it are on disk. Folders cannot
+# be opened on Windows, where NTFS journals the metadata anyway.
+def sync_dir(folder):
+    try:
+        fd = os.open(folder, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# Create an empty staging folder with the vehicle's folder structure for
+# vehicle_name under output_dir and return its path
+def new_staging(output_dir, vehicle_name, file_kinds=None, metrics=None):
+    staging_root = os.path.join(output_dir, STAGING_DIR)
+    os.makedirs(staging_root, exist_ok=True)
+    staging = os.path.join(staging_root, f"{vehicle_name}.{os.getpid()}.{threading.get_ident()}")
+    if os.path.lexists(staging):
+        shutil.rmtree(staging)
+    create_vehicle_folders(staging, metrics, file_kinds)
+    return staging
+
+
+# Rename a filled staging folder to base_path. With durability "vehicle"
+# the staged folders are fsynced first and the parent folder afterwards.
+def publish(staging, base_path, durability="none", file_kinds=None, metrics=None):
+    start = time.perf_counter_ns()
+    if durability == "vehicle":
+        for folder in reversed(vehicle_dirs(file_kinds)):
+            sync_dir(os.path.join(staging, *folder.split("/")))
+        sync_dir(staging)
+    os.rename(staging, base_path)
+    _remove_staging_root(os.path.dirname(staging))
+    if durability == "vehicle":
+        sync_dir(os.path.dirname(base_path))
+    if metrics is not None:
+        metrics.record("publish", time.perf_counter_ns() - start)
+
+
+def discard(staging):
+    shutil.rmtree(staging, ignore_errors=True)
+    _remove_staging_root(os.path.dirname(staging))
+
+
+# Remove what an interrupted run left of vehicle_name under output_dir:
+# its staging folders and the temporary files in its vehicle folder
+def discard_leftovers(output_dir, vehicle_name, file_kinds=None):
+    staging_root = os.path.join(output_dir, STAGING_DIR)
+    for staging in glob.glob(os.path.join(glob.escape(staging_root), glob.escape(vehicle_name) + ".*")):
+        shutil.rmtree(staging, ignore_errors=True)
+    _remove_staging_root(staging_root)
+    base_path = os.path.join(output_dir, vehicle_name)
+    for folder in ("",) + tuple(vehicle_dirs(file_kinds)):
+        try:
+            entries = list(os.scandir(os.path.join(base_path, *folder.split("/"))))
+        except OSError:
+            continue
+        for entry in entries:
+            if _TEMPORARY.fullmatch(entry.name) and entry.is_file(follow_symlinks=False):
+                os.remove(entry.path)
+
+
+# Remove the staging root once nothing is staged in it (other vehicles
+# being generated at the same time keep it)
+def _remove_staging_root(staging_root):
+    try:
+        os.rmdir(staging_root)
+    except OSError:
+        pass
+
+
+# Write the rendered files of vehicle_name under output_dir atomically (see
+# above). Returns the (label, path) pairs of the published files.
+def publish_vehicle(output_dir, vehicle_name, rendered_files, durability="none", file_kinds=None, metrics=None):
+    sync = _sync_files(durability)
+    base_path = os.path.join(output_dir, vehicle_name)
+    if os.path.lexists(base_path):
+        return replace_vehicle_files(base_path, rendered_files, sync, file_kinds, metrics)
+    staging = new_staging(output_dir, vehicle_name, file_kinds, metrics)
+    try:
+        write_vehicle_files(staging, rendered_files, metrics, sync)
+        publish(staging, base_path, durability, file_kinds, metrics)
+    except BaseException:
+        discard(staging)
+        raise
+    return [
+        (rendered.label, os.path.join(base_path, *rendered.folder, rendered.filename)) for rendered in rendered_files
+    ]
+
+
+# Replace the files of an existing vehicle folder one by one through
+# temporary names
+def replace_vehicle_files(base_path, rendered_files, sync=False, file_kinds=None, metrics=None):
+    create_vehicle_folders(base_path, metrics, file_kinds)
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    files = []
+    for rendered in rendered_files:
+        start = time.perf_counter_ns()
+        file_path = os.path.join(base_path, *rendered.folder, rendered.filename)
+        try:
+            write_bytes(file_path + suffix, rendered.data, sync)
+            os.replace(file_path + suffix, file_path)
+        except BaseException:
+            try:
+                os.remove(file_path + suffix)
+            except OSError:
+                pass
+            raise
+        files.append((rendered.label, file_path))
+        if metrics is not None:
+            metrics.record("write", time.perf_counter_ns() - start, len(rendered.data), rendered.kind)
+    if sync:
+        for folder in vehicle_dirs(file_kinds):
+            sync_dir(os.path.join(base_path, *folder.split("/")))
+    return files
+
+
+# End of a batch: with durability "batch" flush everything written
+# (os.sync where available; elsewhere the files were fsynced as they were
+# written) and the output folder's entries. Removes the staging folder.
+def finish_batch(output_dir, durability="none"):
+    if durability == "batch":
+        if hasattr(os, "sync"):
+            os.sync()
+        sync_dir(output_dir)
+    _remove_staging_root(os.path.join(output_dir, STAGING_DIR))
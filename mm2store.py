@@ -0,0 +1,184 @@
+"""Content-addressed output for large fleets.
+
+Most generated files are byte-identical between vehicles (banger, camera
+and most tune files). In store mode each distinct file content is written
+once to <output>/.mm2store/<hash prefix>/<hash> and the vehicle files are
+links to it:
+
+    hardlink  one inode shared by every vehicle, no data written per file.
+              Editing such a file in place changes it for every vehicle;
+              replace it (save as a new file) to change a single vehicle.
+              The generator does so itself when it writes over a link
+              without --store (see mm2core.write_bytes).
+    reflink   a copy made with os.copy_file_range, which clones the data
+              copy-on-write on Btrfs and XFS and is an in-kernel copy on
+              other Linux file systems.
+
+Where neither works (no hardlinks on the file system, no copy_file_range
+on the platform) the file is written normally.
+"""
+import errno
+import functools
+import os
+import threading
+from mm2core import content_digest
+
+STORE_DIR = ".mm2store"
+LINK_MODES = ("hardlink", "reflink")
+
+
+# A sink (see mm2output) writing vehicle folders under root with their
+# files linked into the store
+class ContentStore:
+    per_vehicle_folder = True
+
+    def __init__(self, root, link="hardlink"):
+        if link not in LINK_MODES:
+            raise ValueError(f"Unknown link mode '{link}' (use {', '.join(LINK_MODES)})")
+        self.root = root
+        self.link = link
+        self.store_dir = os.path.join(root, STORE_DIR)
+        # digest -> replica currently linked to; file systems limit the
+        # links of one file (1023 on NTFS, 65000 on ext4), so popular
+        # blobs get further copies
+        self._replicas = {}
+        # (digest, replica) of the blobs known to be in the store
+        self._known = set()
+        self._links_supported = True
+
+    def path(self, name):
+        return os.path.join(self.root, *name.split("/"))
+
+    def add_dir(self, name):
+        os.makedirs(self.path(name), exist_ok=True)
+
+    def add_file(self, name, data):
+        target = self.path(name)
+        digest = content_digest(data)
+        replica = self._replicas.get(digest, 0)
+        blob = self._blob(digest, replica, data)
+        if self.link == "reflink":
+            self._reflink(blob, target, len(data), data)
+            return
+        while self._links_supported:
+            # Not through a temporary name: renaming a link over another
+            # link to the same file does nothing
+            try:
+                os.remove(target)
+            except FileNotFoundError:
+                pass
+            try:
+                os.link(blob, target)
+                return
+            except OSError as e:
+                if e.errno != errno.EMLINK and getattr(e, "winerror", None) != 1142:
+                    # No hardlinks on this file system
+                    self._links_supported = False
+                    break
+            replica += 1
+            self._replicas[digest] = replica
+            blob = self._blob(digest, replica, data)
+        _replace_with(target, lambda tmp: _write(tmp, data))
+
+    # Path of a blob, written first if it is not in the store yet. The
+    # first time a blob is used its contents are hashed: one that no longer
+    # matches its digest was changed through one of its links by something
+    # outside the generator (an in-place tune edit keeps the size) and is
+    # written again.
+    def _blob(self, digest, replica, data):
+        blob = os.path.join(self.store_dir, digest[:2], digest + (f".{replica}" if replica else ""))
+        if (digest, replica) not in self._known:
+            try:
+                with open(blob, "rb") as file:
+                    intact = content_digest(file.read()) == digest
+            except FileNotFoundError:
+                intact = False
+            if not intact:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                _replace_with(blob, lambda tmp: _write(tmp, data))
+            self._known.add((digest, replica))
+        return blob
+
+    def _reflink(self, blob, target, size, data):
+        def clone(tmp):
+            with open(blob, "rb") as source, open(tmp, "wb") as destination:
+                if hasattr(os, "copy_file_range"):
+                    try:
+                        copied = 0
+                        while copied < size:
+                            count = os.copy_file_range(source.fileno(), destination.fileno(), size - copied)
+                            if not count:
+                                break
+                            copied += count
+                        if copied == size:
+                            return
+                    except OSError:
+                        pass
+                    destination.seek(0)
+                    destination.truncate()
+                destination.write(data)
+        _replace_with(target, clone)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _write(path, data):
+    with open(path, "wb") as file:
+        file.write(data)
+
+
+# Create path through a temporary name so an existing file is replaced in
+# one step and concurrent writers never see half a file
+def _replace_with(path, create):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        create(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+# Stores are kept per process and root, so worker processes share the
+# replica bookkeeping between the vehicles they generate
+@functools.lru_cache(maxsize=None)
+def open_store(root, link="hardlink"):
+    return ContentStore(root, link)
+
+
+# Remove the temporary files of blobs a killed process was writing. Only
+# safe while no other process writes to the store.
+def remove_temporary(root):
+    store_dir = os.path.join(root, STORE_DIR)
+    if not os.path.isdir(store_dir):
+        return
+    for prefix in os.scandir(store_dir):
+        if prefix.is_dir():
+            for entry in os.scandir(prefix.path):
+                if entry.name.endswith(".tmp"):
+                    os.remove(entry.path)
+
+
+# Number of blobs in the store under root and their total size in bytes
+def store_usage(root):
+    blobs = size = 0
+    store_dir = os.path.join(root, STORE_DIR)
+    if not os.path.isdir(store_dir):
+        return 0, 0
+    for prefix in os.scandir(store_dir):
+        if prefix.is_dir():
+            for entry in os.scandir(prefix.path):
+                if not entry.name.endswith(".tmp"):
+                    blobs += 1
+                    size += entry.stat().st_size
+    return blobs, size
@@ -0,0 +1,270 @@
+"""Tuning sweeps: many vehicles that differ only in some tune values.
+
+A sweep spec is a JSON file naming the values to vary:
+
+    {
+      "base_name": "vpopp",
+      "description": "Opponent sweep",
+      "colors": "Red|Blue",
+      "mode": "grid",
+      "params": {
+        "veh_opp_carsim:vehCarSim.Mass": {"min": 1100, "max": 1500, "num": 5},
+        "veh_opp_carsim:vehCarSim.Engine.MaxHorsePower": [400, 450, 500],
+        "veh_opp_carsim:vehCarSim.Trans.GearRatios[2]": {"min": 24, "max": 32, "num": 3}
+      }
+    }
+
+A parameter is a file kind of the registry, the dotted path of a field in
+its tune file (see mm2tune) and, for fields with several values, the index
+of the value. With mode "grid" every combination of the parameter values is
+a vehicle (a range gives num evenly spaced values from min to max). With
+mode "random" there are "samples" vehicles, each drawing every parameter
+uniformly from its range or list, with the generator seeded by "seed" so
+that the same spec gives the same vehicles.
+
+The parameter matrix (a row per vehicle) is computed with NumPy. Each
+swept file kind gets its mm2params.Schema, split once around the swept
+values only (Schema.select), and the files of many rows are formatted at
+once from the matrix (see mm2format). Vehicles are written by
+mm2core.generate_vehicle like any other, named base_name plus the row
+number, and the matrix is saved as sweep.csv in the output folder.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+import mm2format
+from mm2core import NEWLINES, generate_vehicle, get_file_kinds, normalize_colors, seed_overrides, validate_vehicle
+from mm2params import schema_for
+
+SWEEP_MODES = ("grid", "random")
+SWEEP_CSV = "sweep.csv"
+_PARAM = re.compile(r"(\w+):([^\s\[\]]+)(?:\[(\d+)\])?")
+
+# A swept value: kind:path[index] split up. index is None for fields with
+# a single value.
+Param = namedtuple("Param", ["name", "kind", "path", "index"])
+
+SweepStats = namedtuple("SweepStats", ["vehicles", "written", "unchanged"])
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Tuning sweeps need NumPy: pip install numpy") from None
+    return numpy
+
+
+def parse_param(name):
+    match = _PARAM.fullmatch(name)
+    if match is None:
+        raise ValueError(f"Sweep parameter '{name}' is not kind:path or kind:path[index]")
+    kind, path, index = match.groups()
+    return Param(name, kind, path, None if index is None else int(index))
+
+
+# Read and check a sweep spec
+def load_spec(path):
+    with open(path, encoding="utf-8") as spec_file:
+        spec = json.load(spec_file)
+    if not isinstance(spec, dict):
+        raise ValueError(f"'{path}' is not a sweep spec (expected a JSON object)")
+    spec.setdefault("mode", "grid")
+    validate_vehicle(spec.get("base_name"), spec.get("description"), spec.get("colors"))
+    if spec["mode"] not in SWEEP_MODES:
+        raise ValueError(f"Unknown sweep mode '{spec['mode']}' (use {', '.join(SWEEP_MODES)})")
+    if spec["mode"] == "random" and not isinstance(spec.get("samples"), int):
+        raise ValueError("A random sweep needs the number of \"samples\"")
+    if not spec.get("params"):
+        raise ValueError(f"'{path}' has no \"params\" to sweep")
+    for name, values in spec["params"].items():
+        parse_param(name)
+        if isinstance(values, dict):
+            missing = {"min", "max"} - set(values) | ({"num"} - set(values) if spec["mode"] == "grid" else set())
+            if missing:
+                raise ValueError(f"Sweep parameter '{name}' is missing {', '.join(sorted(missing))}")
+        elif not isinstance(values, list) or not values:
+            raise ValueError(f"Sweep parameter '{name}' needs a list of values or min, max and num")
+    return spec
+
+
+# The parameter matrix of a spec's params ({name: range or list}): one row
+# per vehicle, one column per parameter in the order of params
+def sweep_matrix(params, mode="grid", samples=None, seed=None):
+    np = _numpy()
+    if mode == "grid":
+        axes = [
+            np.linspace(values["min"], values["max"], int(values["num"])) if isinstance(values, dict)
+            else np.asarray(values, dtype=float)
+            for values in params.values()
+        ]
+        return np.stack([axis.ravel() for axis in np.meshgrid(*axes, indexing="ij")], axis=1)
+    if mode == "random":
+        rng = np.random.default_rng(seed)
+        return np.column_stack([
+            rng.uniform(values["min"], values["max"], samples) if isinstance(values, dict)
+            else rng.choice(np.asarray(values, dtype=float), samples)
+            for values in params.values()
+        ])
+    raise ValueError(f"Unknown sweep mode '{mode}' (use {', '.join(SWEEP_MODES)})")
+
+
+# The schema slot (see mm2params) a parameter sweeps
+def _slot(schema, param):
+    values = [name for name in schema.names if name.startswith(param.path + "[")]
+    if param.path in schema.index and param.index in (None, 0):
+        return param.path
+    if param.index is None and values:
+        raise ValueError(
+            f"Sweep parameter '{param.name}': {param.path} has {len(values)} values, "
+            f"give the one to sweep as {param.path}[index]"
+        )
+    name = f"{param.path}[{param.index}]"
+    if name in schema.index:
+        return name
+    if values or param.path in schema.index:
+        raise ValueError(f"Sweep parameter '{param.name}': there is no number {name}")
+    raise ValueError(f"Sweep parameter '{param.name}': the {schema.kind} file has no number field {param.path}")
+
+
+class SweptFile:
+    # A tune file of one kind split around its swept values: segments[0],
+    # the value of columns[0], segments[1], and so on, with columns indexing
+    # the matrix. schema is its mm2params.Schema.
+    def __init__(self, schema, params):
+        slots = {}
+        param_of = {}
+        for column, param in params:
+            slot = _slot(schema, param)
+            if slot in slots:
+                raise ValueError(f"Sweep parameters '{param_of[slot]}' and '{param.name}' are the same value")
+            slots[slot] = column
+            param_of[slot] = param.name
+        self.kind = schema.kind
+        self.integer = {column: schema.integer[schema.index[slot]] for slot, column in slots.items()}
+        self.segments, names = schema.select(slots)
+        self.columns = [slots[name] for name in names]
+
+    # The file of every row of the matrix
+    def render_rows(self, matrix):
+        return mm2format.render_rows(
+            self.segments, matrix[:, self.columns], [self.integer[column] for column in self.columns]
+        )
+
+
+# Split each swept file kind once. The files start from the registry's
+# templates, or from the tune files of a seed (archive path, vehicle) pair.
+def compile_sweep(param_names, newline=os.linesep, file_kinds=None, seed=None):
+    kinds = {kind.kind: kind for kind in get_file_kinds(file_kinds)}
+    base = seed_overrides(*seed, file_kinds) if seed else {}
+    by_kind = {}
+    for column, name in enumerate(param_names):
+        param = parse_param(name)
+        kind = kinds.get(param.kind)
+        if kind is None:
+            raise ValueError(f"Sweep parameter '{name}': unknown file kind '{param.kind}'")
+        if kind.params:
+            raise ValueError(f"Sweep parameter '{name}': the {param.kind} file is not a tune file")
+        by_kind.setdefault(param.kind, []).append((column, param))
+    return [
+        SweptFile(schema_for(kind, newline, file_kinds, base.get(kind)), params)
+        for kind, params in by_kind.items()
+    ]
+
+
+# Generate the vehicles of a sweep spec under output_dir (or into archive,
+# an mm2output sink). options go to generate_vehicle. progress(done, total)
+# is called after every vehicle.
+def run_sweep(spec, output_dir, newline=os.linesep, file_kinds=None, seed=None, progress=None, **options):
+    names = list(spec["params"])
+    matrix = sweep_matrix(spec["params"], spec.get("mode", "grid"), spec.get("samples"), spec.get("seed"))
+    swept = compile_sweep(names, newline, file_kinds, seed)
+    integer = {}
+    for swept_file in swept:
+        integer.update(swept_file.integer)
+    for column, is_integer in integer.items():
+        if is_integer:
+            matrix[:, column] = _numpy().rint(matrix[:, column])
+    formatted = [mm2format.format_fixed(matrix[:, column], integer[column]) for column in range(len(names))]
+
+    rows = len(matrix)
+    width = len(str(max(rows - 1, 0)))
+    base_name = spec["base_name"].strip()
+    description = spec["description"].strip()
+    colors = normalize_colors(spec["colors"])
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, SWEEP_CSV), "w", encoding="utf-8", newline="") as matrix_file:
+        writer = csv.writer(matrix_file)
+        writer.writerow(["name"] + names)
+        for row, values in enumerate(zip(*formatted)):
+            writer.writerow([f"{base_name}{row:0{width}d}"] + [value.decode("ascii") for value in values])
+
+    files = [swept_file.render_rows(matrix) for swept_file in swept]
+    written = unchanged = 0
+    for row, datas in enumerate(zip(*files)):
+        overrides = {swept_file.kind: data for swept_file, data in zip(swept, datas)}
+        result = generate_vehicle(
+            f"{base_name}{row:0{width}d}", description, colors, output_dir, newline, file_kinds,
+            seed=seed, overrides=overrides, **options,
+        )
+        written += result.written
+        unchanged += result.unchanged
+        if progress:
+            progress(row + 1, rows)
+    return SweepStats(rows, written, unchanged)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="mm2basestruc sweep",
+        description="Generate vehicle variants from ranges of tune values (needs NumPy).",
+    )
+    parser.add_argument("spec", help="sweep spec (JSON) with the base name and the parameters to vary")
+    parser.add_argument("-o", "--output", default=os.getcwd(), help="folder the vehicles and sweep.csv are created in (default: current folder)")
+    parser.add_argument("--newline", choices=sorted(NEWLINES), default="native", help="line ending of the tune files (default: native)")
+    parser.add_argument("--file-kinds", metavar="JSON", help="file kind registry to use instead of templates/file_kinds.json")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--incremental", action="store_true", help="only write files whose contents changed since the last run")
+    output.add_argument("--archive", metavar="PATH", help="write every vehicle into one .zip, .tar, .tar.gz, .tar.xz or MM2 .ar archive")
+    output.add_argument("--store", choices=("hardlink", "reflink"), help="write identical files once to OUTPUT/.mm2store and link them into the vehicles")
+    parser.add_argument("--seed-ar", metavar="ARCHIVE", help="start from the tune files of a vehicle in an existing .ar archive")
+    parser.add_argument("--seed-vehicle", metavar="NAME", help="vehicle in --seed-ar to start from (default: the only one)")
+    parser.add_argument("--progress-every", type=int, default=1000, metavar="N", help="report progress every N vehicles (0 disables)")
+    args = parser.parse_args(argv)
+
+    start = time.monotonic()
+
+    def progress(done, total):
+        if args.progress_every and done % args.progress_every == 0:
+            rate = done / max(time.monotonic() - start, 1e-9)
+            print(f"{done}/{total} vehicles generated ({rate:.1f} vehicles/s)", file=sys.stderr)
+
+    file_kinds = args.file_kinds and os.path.abspath(args.file_kinds)
+    seed = (os.path.abspath(args.seed_ar), args.seed_vehicle) if args.seed_ar else None
+    try:
+        spec = load_spec(args.spec)
+        with contextlib.ExitStack() as stack:
+            options = {"incremental": args.incremental, "store": args.store}
+            if args.archive:
+                from mm2output import open_archive
+                options["sink"] = stack.enter_context(open_archive(args.archive))
+            stats = run_sweep(spec, args.output, NEWLINES[args.newline], file_kinds, seed, progress, **options)
+    except (ImportError, OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(
+        f"Generated {stats.vehicles} vehicles in {time.monotonic() - start:.2f}s "
+        f"({stats.written} files written, {stats.unchanged} unchanged)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
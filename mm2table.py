@@ -0,0 +1,304 @@
+"""Table mode of the GUI: many vehicles at once.
+
+Rows (name, description, colors) are typed, pasted from a spreadsheet or
+imported from a .csv / .jsonl manifest, then generated concurrently on a
+thread pool with the same GenerationWorker as the main window. Each row
+shows its own status, the status bar shows the throughput and a summary
+is shown when the run is over.
+"""
+import csv
+import functools
+import os
+import time
+from PyQt5.QtCore import Qt, QThreadPool
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtWidgets import (
+    QAbstractItemView, QApplication, QFileDialog, QHBoxLayout, QHeaderView, QLabel, QMainWindow, QMessageBox,
+    QPushButton, QShortcut, QSpinBox, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget,
+)
+from mm2batch import read_manifest_rows
+from mm2core import VehicleSpec, normalize_colors, validate_vehicle
+from mm2metrics import Metrics, export_to_environment, metrics_from_environment
+from mm2worker import GenerationWorker
+
+COLUMNS = ("Name", "Description", "Colors", "Status")
+STATUS_COLUMN = 3
+
+# Threads for concurrent generation; writing files mostly waits on the
+# disk, so more threads than CPUs still help
+DEFAULT_THREADS = min(32, (os.cpu_count() or 1) + 4)
+
+
+# Rows of text pasted from a spreadsheet (tab separated) or a CSV file,
+# as (name, description, colors) lists. A name,description,colors header
+# is skipped.
+def parse_pasted_rows(text):
+    lines = [line for line in text.splitlines() if line.strip()]
+    delimiter = "\t" if any("\t" in line for line in lines) else ","
+    rows = [(row + ["", "", ""])[:3] for row in csv.reader(lines, delimiter=delimiter)]
+    if rows and [cell.strip().lower() for cell in rows[0]] == ["name", "description", "colors"]:
+        rows = rows[1:]
+    return rows
+
+
+class VehicleTableWindow(QMainWindow):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Structure Generator - Vehicles")
+        self.resize(720, 480)
+        if parent is not None:
+            self.setStyleSheet(parent.styleSheet())
+            self.setWindowIcon(parent.windowIcon())
+        self.output_dir = os.getcwd()
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(DEFAULT_THREADS)
+        self.workers = []
+        # Worker -> (row, files written, files) of the vehicle it is on
+        self.current = {}
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        QShortcut(QKeySequence.Paste, self.table, self.paste_rows, context=Qt.WidgetWithChildrenShortcut)
+        QShortcut(QKeySequence.Delete, self.table, self.remove_rows, context=Qt.WidgetWithChildrenShortcut)
+
+        self.importButton = self._button("Import...", self.import_rows, "Add the rows of a .csv or .jsonl manifest")
+        self.pasteButton = self._button("Paste", self.paste_rows, "Add rows copied from a spreadsheet (Ctrl+V)")
+        self.addButton = self._button("Add Row", self.add_empty_row, "Add an empty row")
+        self.removeButton = self._button("Remove", self.remove_rows, "Remove the selected rows (Del)")
+        self.clearButton = self._button("Clear", self.clear_rows, "Remove every row")
+        self.folderButton = self._button("Folder...", self.choose_folder, "Folder the vehicles are created in")
+        self.folderLabel = QLabel(self.output_dir)
+        self.threadsInput = QSpinBox()
+        self.threadsInput.setRange(1, 64)
+        self.threadsInput.setValue(DEFAULT_THREADS)
+        self.threadsInput.setPrefix("Threads: ")
+        self.generateButton = self._button("Generate", self.generate, "Generate every row")
+        self.cancelButton = self._button("Cancel", self.cancel, "Stop after the files being written")
+        self.cancelButton.setEnabled(False)
+
+        rows = QHBoxLayout()
+        for widget in (self.importButton, self.pasteButton, self.addButton, self.removeButton, self.clearButton):
+            rows.addWidget(widget)
+        rows.addStretch()
+        footer = QHBoxLayout()
+        for widget in (self.folderButton, self.folderLabel):
+            footer.addWidget(widget)
+        footer.addStretch()
+        for widget in (self.threadsInput, self.generateButton, self.cancelButton):
+            footer.addWidget(widget)
+        layout = QVBoxLayout()
+        layout.addLayout(rows)
+        layout.addWidget(self.table)
+        layout.addLayout(footer)
+        central = QWidget()
+        central.setLayout(layout)
+        self.setCentralWidget(central)
+        self.statusBar().showMessage("Paste or import vehicles (name, description, colors)")
+
+    def _button(self, text, slot, tip):
+        button = QPushButton(text)
+        button.setToolTip(tip)
+        button.clicked.connect(slot)
+        return button
+
+    # Rows
+    def add_row(self, name="", description="", colors="", status=""):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        for column, text in enumerate((name, description, colors)):
+            self.table.setItem(row, column, QTableWidgetItem(text))
+        status_item = QTableWidgetItem(status)
+        status_item.setFlags(status_item.flags() & ~Qt.ItemIsEditable)
+        self.table.setItem(row, STATUS_COLUMN, status_item)
+
+    def add_empty_row(self):
+        self.add_row()
+        self.table.editItem(self.table.item(self.table.rowCount() - 1, 0))
+
+    def paste_rows(self):
+        rows = parse_pasted_rows(QApplication.clipboard().text())
+        for row in rows:
+            self.add_row(*row)
+        self.statusBar().showMessage(f"Pasted {len(rows)} rows", 5000)
+
+    def import_rows(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Vehicles", self.output_dir, "Manifests (*.csv *.jsonl *.ndjson);;All files (*)"
+        )
+        if not path:
+            return
+        count = 0
+        try:
+            for line_num, row in read_manifest_rows(path):
+                if isinstance(row, ValueError):
+                    self.add_row(status=f"Line {line_num}: {row}")
+                else:
+                    self.add_row(*(value or "" for value in row))
+                count += 1
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"Failed to import '{path}': {e}")
+        self.statusBar().showMessage(f"Imported {count} rows from {os.path.basename(path)}", 5000)
+
+    def remove_rows(self):
+        for row in sorted({index.row() for index in self.table.selectedIndexes()}, reverse=True):
+            self.table.removeRow(row)
+
+    def clear_rows(self):
+        self.table.setRowCount(0)
+
+    def choose_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Output Folder", self.output_dir)
+        if folder:
+            self.output_dir = folder
+            self.folderLabel.setText(folder)
+
+    def _text(self, row, column):
+        item = self.table.item(row, column)
+        return item.text().strip() if item is not None else ""
+
+    def _set_status(self, row, text):
+        self.table.item(row, STATUS_COLUMN).setText(text)
+
+    # Generation
+    def generate(self):
+        specs = []
+        names = {}
+        for row in range(self.table.rowCount()):
+            vehicle_name, description, variations = (self._text(row, column) for column in range(3))
+            try:
+                validate_vehicle(vehicle_name, description, variations)
+            except ValueError as e:
+                self._set_status(row, f"Invalid: {e}")
+                continue
+            # Rows generated at the same time must not write the same folder
+            duplicate = names.setdefault(vehicle_name.lower(), row)
+            if duplicate != row:
+                self._set_status(row, f"Invalid: same name as row {duplicate + 1}")
+                continue
+            specs.append((row, VehicleSpec(vehicle_name, description, normalize_colors(variations))))
+        if not specs:
+            self.statusBar().showMessage("Nothing to generate", 5000)
+            return
+
+        self._set_running(True)
+        self.pool.setMaxThreadCount(self.threadsInput.value())
+        self.run = {
+            "vehicles": len(specs), "done": 0, "failed": 0, "cancelled": 0, "files": 0,
+            "start": time.monotonic(), "shown": 0.0,
+            # (row, text) of the generated and failed vehicles
+            "results": [], "errors": [],
+            "metrics": metrics_from_environment({"source": "gui-table"}),
+        }
+        # One worker per row; the pool runs as many at a time as it has threads
+        for row, spec in specs:
+            self._set_status(row, "Queued")
+            worker = GenerationWorker([spec], self.output_dir, Metrics() if self.run["metrics"] else None)
+            worker.row = row
+            worker.signals.started.connect(functools.partial(self.on_vehicle_started, worker))
+            worker.signals.progress.connect(functools.partial(self.on_vehicle_progress, worker))
+            worker.signals.vehicle_done.connect(functools.partial(self.on_vehicle_done, worker))
+            worker.signals.vehicle_failed.connect(functools.partial(self.on_vehicle_failed, worker))
+            worker.signals.finished.connect(functools.partial(self.on_worker_finished, worker))
+            self.workers.append(worker)
+            self.pool.start(worker)
+
+    def cancel(self):
+        for worker in self.workers:
+            worker.cancel()
+        self.statusBar().showMessage("Cancelling...")
+
+    def _set_running(self, running):
+        for widget in (self.importButton, self.pasteButton, self.addButton, self.removeButton, self.clearButton,
+                       self.folderButton, self.threadsInput, self.generateButton):
+            widget.setEnabled(not running)
+        self.cancelButton.setEnabled(running)
+        self.table.setEditTriggers(
+            QAbstractItemView.NoEditTriggers if running else QAbstractItemView.AllEditTriggers
+        )
+
+    def on_vehicle_started(self, worker, index, vehicle_name):
+        self.current[worker] = (worker.row, 0, 0)
+        self._set_status(worker.row, "Generating...")
+
+    def on_vehicle_progress(self, worker, index, done, total):
+        self.current[worker] = (worker.row, done, total)
+        self._set_status(worker.row, f"Generating {done}/{total}")
+
+    def on_vehicle_done(self, worker, index, base_path, generated):
+        self.current.pop(worker, None)
+        self._set_status(worker.row, f"Done ({len(generated)} files)")
+        self.run["done"] += 1
+        self.run["files"] += len(generated)
+        self.run["results"].append((worker.row, f"{worker.specs[index].name}: {base_path}"))
+        self._show_throughput()
+
+    def on_vehicle_failed(self, worker, index, message):
+        self.current.pop(worker, None)
+        self._set_status(worker.row, f"Failed: {message}")
+        self.run["failed"] += 1
+        self.run["errors"].append((worker.row, f"{worker.specs[index].name}: {message}"))
+        self._show_throughput()
+
+    def on_worker_finished(self, worker, cancelled):
+        self.workers.remove(worker)
+        interrupted = self.current.pop(worker, None)
+        if cancelled:
+            self.run["cancelled"] += 1
+            if interrupted:
+                row, done, total = interrupted
+                self._set_status(row, f"Cancelled after {done}/{total} files")
+            else:
+                self._set_status(worker.row, "Cancelled")
+        if self.run["metrics"] is not None:
+            self.run["metrics"].merge(worker.metrics)
+        if not self.workers:
+            self._finish_run()
+
+    # Vehicles and files per second in the status bar, at most every 0.2 s
+    def _show_throughput(self, final=False):
+        now = time.monotonic()
+        if not final and now - self.run["shown"] < 0.2:
+            return
+        self.run["shown"] = now
+        elapsed = max(now - self.run["start"], 1e-9)
+        run = self.run
+        self.statusBar().showMessage(
+            f"{run['done'] + run['failed']}/{run['vehicles']} vehicles ({run['failed']} failed), {run['files']} files"
+            f" - {run['done'] / elapsed:.1f} vehicles/s, {run['files'] / elapsed:.0f} files/s"
+        )
+
+    def _finish_run(self):
+        self._show_throughput(final=True)
+        self._set_running(False)
+        run = self.run
+        elapsed = time.monotonic() - run["start"]
+        if run["metrics"] is not None:
+            try:
+                export_to_environment(run["metrics"])
+            except OSError as e:
+                run["errors"].append((-1, f"Failed to export metrics: {e}"))
+        if not self.isVisible():
+            return
+
+        # Summary instead of one dialog listing every file
+        summary = QMessageBox(self)
+        summary.setWindowTitle("Summary")
+        summary.setIcon(QMessageBox.Warning if run["failed"] or run["cancelled"] else QMessageBox.Information)
+        summary.setText(
+            f"Generated {run['done']} of {run['vehicles']} vehicles ({run['files']} files) in {elapsed:.1f}s.\n"
+            f"{run['failed']} failed, {run['cancelled']} cancelled.\n\n"
+            f"Folder: {self.output_dir}"
+        )
+        # Failures first, then the generated folders, in table order
+        summary.setDetailedText("\n".join(text for _, text in sorted(run["errors"]) + sorted(run["results"])))
+        summary.exec_()
+
+    # Let running generation stop at the next file before the window goes
+    def closeEvent(self, event):
+        for worker in self.workers:
+            worker.cancel()
+        self.pool.waitForDone()
+        super().closeEvent(event)
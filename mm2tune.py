@@ -0,0 +1,260 @@
+"""Reader and writer for the MM2 "type: a" tune format.
+
+The files written for asNode, mmMirror, vehCarSim, vehCarDamage, vehGyro,
+vehStuck, camTrackCS, camPovCS and dgBangerData are nested blocks:
+
+    type: a
+    vehCarSim {
+      Mass 5300.000000
+      Aero {
+        AngCDamp 1.000000	4.000000	3.000000
+      }
+    }
+
+tokenize() streams one token per line, parse() builds a typed tree out of
+them and dump() writes the tree back. Indentation, separators, trailing
+spaces and line endings are kept, so an unmodified tree dumps to the exact
+bytes it was parsed from. Modified float values are written as %.6f.
+"""
+import functools
+import operator
+import re
+
+# Files are treated as latin-1 so any byte survives a round trip
+ENCODING = "latin-1"
+
+_HEADER = re.compile(r"type:\s*\S+\s*")
+# One pattern for every line kind: indent, then a closing brace, a
+# "name {" or a "key values...", then trailing blanks and the line ending
+_LINE = re.compile(
+    r"([ \t]*)(?:(\})|([^\s{}]+)([ \t]*)\{|([^\s{}]+)((?:[ \t]+[^\s{}]+)*))([ \t]*)(\r?\n)?"
+)
+_VALUE = re.compile(r"([ \t]+)(\S+)")
+_INT = re.compile(r"[-+]?\d+")
+
+
+class TuneSyntaxError(ValueError):
+    pass
+
+
+# Typed value of a token: int, float or the text itself. Tune files repeat
+# the same few values a lot, so results are cached.
+@functools.lru_cache(maxsize=4096)
+def parse_value(text):
+    if _INT.fullmatch(text):
+        return int(text)
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def format_value(value):
+    if isinstance(value, float):
+        return "%.6f" % value
+    return str(value)
+
+
+class Field:
+    __slots__ = ("key", "values", "_parsed", "_layout")
+
+    def __init__(self, key, values, layout=None):
+        self.key = key
+        self.values = list(values)
+        # Values as parsed; while they are untouched the original text is
+        # written back as it was
+        self._parsed = tuple(self.values) if layout else ()
+        # (indent, separators and value texts, trailing, line ending)
+        self._layout = layout
+
+    def __repr__(self):
+        return f"Field({self.key!r}, {self.values!r})"
+
+    def emit(self, out, depth, newline):
+        values, parsed = self.values, self._parsed
+        if self._layout is not None and len(values) == len(parsed) and all(map(operator.is_, values, parsed)):
+            indent, rest, trailing, eol = self._layout
+            out.append(f"{indent}{self.key}{rest}{trailing}{eol}")
+            return
+        if self._layout:
+            indent, rest, trailing, eol = self._layout
+            pairs = _VALUE.findall(rest)
+        else:
+            indent, trailing, eol, pairs = "  " * depth, " ", newline, ()
+        parts = [indent, self.key]
+        for i, value in enumerate(values):
+            if i < len(pairs):
+                sep, text = pairs[i]
+                parts.append(sep)
+                parts.append(text if i < len(parsed) and value is parsed[i] else format_value(value))
+            else:
+                # New values reuse the file's last separator
+                parts.append(pairs[-1][0] if pairs else " ")
+                parts.append(format_value(value))
+        parts.append(trailing)
+        parts.append(eol)
+        out.append("".join(parts))
+
+
+class Raw:
+    # A line that is neither a field nor a brace, kept as it is
+    __slots__ = ("text", "eol")
+
+    def __init__(self, text, eol="\n"):
+        self.text = text
+        self.eol = eol
+
+    def __repr__(self):
+        return f"Raw({self.text!r})"
+
+    def emit(self, out, depth, newline):
+        out.append(self.text + self.eol)
+
+
+class Block:
+    __slots__ = ("name", "items", "_open", "_close")
+
+    def __init__(self, name, items=None, open_layout=None, close_layout=None):
+        self.name = name
+        self.items = items if items is not None else []
+        # (indent, separator, trailing, line ending) of the "name {" line and
+        # (indent, trailing, line ending) of the closing brace
+        self._open = open_layout
+        self._close = close_layout
+
+    def __repr__(self):
+        return f"Block({self.name!r}, {self.items!r})"
+
+    def __iter__(self):
+        return iter(self.items)
+
+    # First field or block with this key
+    def find(self, key):
+        for item in self.items:
+            if getattr(item, "key", None) == key or getattr(item, "name", None) == key:
+                return item
+        return None
+
+    def __getitem__(self, key):
+        item = self.find(key)
+        if item is None:
+            raise KeyError(key)
+        return item
+
+    def __contains__(self, key):
+        return self.find(key) is not None
+
+    def emit(self, out, depth, newline):
+        indent, sep, trailing, eol = self._open or ("  " * depth, " ", "", newline)
+        out.append(f"{indent}{self.name}{sep}{{{trailing}{eol}")
+        for item in self.items:
+            item.emit(out, depth + 1, newline)
+        indent, trailing, eol = self._close or ("  " * depth, "", newline)
+        out.append(f"{indent}}}{trailing}{eol}")
+
+
+class Document(Block):
+    # The top level of a file: the "type: a" header and its blocks
+    __slots__ = ("header", "newline")
+
+    def __init__(self, items=None, header="type: a\n", newline="\n"):
+        super().__init__(None, items)
+        self.header = header
+        self.newline = newline
+
+    def __repr__(self):
+        return f"Document({self.items!r})"
+
+    # Values of a field by dotted path, e.g. "vehCarSim.Engine.MaxHorsePower"
+    def get(self, path):
+        node = self
+        for key in path.split("."):
+            node = node[key]
+        return node.values
+
+    def set(self, path, values):
+        node = self
+        for key in path.split("."):
+            node = node[key]
+        node.values = list(values)
+
+    def to_bytes(self):
+        out = [self.header] if self.header else []
+        for item in self.items:
+            item.emit(out, 0, self.newline)
+        return "".join(out).encode(ENCODING)
+
+
+def _split_eol(line):
+    if line.endswith("\r\n"):
+        return line[:-2], "\r\n"
+    if line.endswith("\n"):
+        return line[:-1], "\n"
+    return line, ""
+
+
+# Stream tokens from an iterable of lines (bytes or str, with their line
+# endings), e.g. a file opened in binary mode. Yields tuples of
+# (line number, kind, details, line ending) where kind is one of header,
+# open, close, field or raw.
+def tokenize(lines):
+    fullmatch = _LINE.fullmatch
+    for line_num, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode(ENCODING)
+        match = fullmatch(line)
+        if match is None or (line_num == 1 and _HEADER.fullmatch(line.rstrip("\r\n"))):
+            text, eol = _split_eol(line)
+            yield line_num, "header" if line_num == 1 and _HEADER.fullmatch(text) else "raw", text, eol
+            continue
+        indent, close, name, sep, key, rest, trailing, eol = match.groups()
+        if key is not None:
+            yield line_num, "field", (indent, key, rest, trailing), eol or ""
+        elif name is not None:
+            yield line_num, "open", (indent, name, sep, trailing), eol or ""
+        else:
+            yield line_num, "close", (indent, trailing), eol or ""
+
+
+# Build a Document from bytes, a str or an iterable of lines
+def parse(source):
+    if isinstance(source, (bytes, str)):
+        source = source.splitlines(keepends=True)
+    document = Document(header="")
+    stack = [document]
+    for line_num, kind, details, eol in tokenize(source):
+        if line_num == 1 and eol:
+            document.newline = eol
+        if kind == "field":
+            key = details[1]
+            stack[-1].items.append(Field(key, map(parse_value, details[2].split()), details[:1] + details[2:] + (eol,)))
+        elif kind == "open":
+            indent, name, sep, trailing = details
+            block = Block(name, open_layout=(indent, sep, trailing, eol))
+            stack[-1].items.append(block)
+            stack.append(block)
+        elif kind == "close":
+            if len(stack) == 1:
+                raise TuneSyntaxError(f"line {line_num}: unexpected '}}'")
+            stack.pop()._close = details + (eol,)
+        elif kind == "header":
+            document.header = details + eol
+        else:
+            stack[-1].items.append(Raw(details, eol))
+    if len(stack) > 1:
+        raise TuneSyntaxError(f"block '{stack[-1].name}' is not closed")
+    return document
+
+
+def load(path):
+    with open(path, "rb") as file:
+        return parse(file)
+
+
+def dump(document):
+    return document.to_bytes()
+
+
+def save(document, path):
+    with open(path, "wb") as file:
+        file.write(document.to_bytes())
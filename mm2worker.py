@@ -0,0 +1,92 @@
+"""Vehicle generation off the Qt main thread.
+
+GenerationWorker is a QRunnable that generates a list of vehicles with the
+core functions on a QThreadPool thread and reports through the Qt signals
+of its WorkerSignals, which are delivered to the GUI thread. cancel() stops
+the worker before the next file is written. New vehicle folders are filled
+in a staging folder and published when complete (see mm2publish), so a
+cancelled or failed vehicle leaves no partial folder behind.
+"""
+import os
+import threading
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+from mm2core import create_vehicle_folders, render_vehicle_files, write_vehicle_files
+from mm2publish import discard, new_staging, publish
+
+
+# Vehicles are identified by their index in the worker's list of specs
+class WorkerSignals(QObject):
+    # index, vehicle name
+    started = pyqtSignal(int, str)
+    # index, files written, files of the vehicle
+    progress = pyqtSignal(int, int, int)
+    # index, base path, (label, path) pairs of the written files
+    vehicle_done = pyqtSignal(int, str, object)
+    # index, error message
+    vehicle_failed = pyqtSignal(int, str)
+    # True when cancelled before every vehicle was generated
+    finished = pyqtSignal(bool)
+
+
+# Generates each VehicleSpec of specs into output_dir (the current folder by
+# default), one after another. metrics is an optional mm2metrics.Metrics;
+# workers running at the same time each need their own.
+class GenerationWorker(QRunnable):
+    def __init__(self, specs, output_dir=None, metrics=None):
+        super().__init__()
+        self.specs = list(specs)
+        self.output_dir = output_dir or os.getcwd()
+        self.metrics = metrics
+        self.signals = WorkerSignals()
+        self._cancel = threading.Event()
+
+    # Can be called from any thread
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def run(self):
+        for index, spec in enumerate(self.specs):
+            if self._cancel.is_set():
+                break
+            self.signals.started.emit(index, spec.name)
+            self._generate(index, spec)
+        self.signals.finished.emit(self._cancel.is_set())
+
+    def _generate(self, index, spec):
+        base_path = os.path.join(self.output_dir, spec.name)
+
+        # Create folder structure
+        staging = None
+        try:
+            if os.path.lexists(base_path):
+                create_vehicle_folders(base_path, self.metrics)
+            else:
+                staging = new_staging(self.output_dir, spec.name, metrics=self.metrics)
+        except Exception as e:
+            self.signals.vehicle_failed.emit(index, f"Failed to create folder structure: {e}")
+            return
+
+        # Generate files and write CSV data, one file at a time so progress
+        # and cancellation are per file
+        try:
+            rendered_files = render_vehicle_files(spec.name, spec.description, spec.colors, metrics=self.metrics)
+            generated = []
+            for rendered in rendered_files:
+                if self._cancel.is_set():
+                    if staging:
+                        discard(staging)
+                    return
+                write_vehicle_files(staging or base_path, (rendered,), self.metrics)
+                generated.append((rendered.label, os.path.join(base_path, *rendered.folder, rendered.filename)))
+                self.signals.progress.emit(index, len(generated), len(rendered_files))
+            if staging:
+                publish(staging, base_path, metrics=self.metrics)
+        except Exception as e:
+            if staging:
+                discard(staging)
+            self.signals.vehicle_failed.emit(index, f"Failed to create configuration files or CSV files: {e}")
+            return
+        self.signals.vehicle_done.emit(index, base_path, generated)